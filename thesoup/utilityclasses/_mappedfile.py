@@ -0,0 +1,62 @@
+import mmap
+import struct
+import sys
+
+_BYTE_ORDER = 0 if sys.byteorder == "little" else 1
+
+
+def write_mapped_file(path: str, header: struct.Struct, magic: bytes, fields: tuple, sections: list):
+    """
+    Writes a binary file that `MappedFile` can read. The layout is a fixed header, starting with the magic bytes and a
+    byte order flag, followed by the sections, each padded to a multiple of 8 bytes so the next one stays aligned.
+    :param path: The file to write
+    :param header: The header struct. Its first 2 fields are the magic bytes and the byte order flag
+    :param magic: The magic bytes that identify the kind of file
+    :param fields: The rest of the header fields
+    :param sections: A list of bytes-like objects. `None`s are skipped
+    :return:
+    """
+    with open(path, "wb") as f:
+        f.write(header.pack(magic, _BYTE_ORDER, *fields))
+        for section in sections:
+            if section is None:
+                continue
+            f.write(section)
+            f.write(b"\0" * (-f.tell() % 8))
+
+
+class MappedFile:
+    """
+    A file written by `write_mapped_file`, memory-mapped read only. The sections are read in the order they were
+    written, as views into the mapping.
+    """
+    def __init__(self, path: str, header: struct.Struct, magic: bytes, kind: str):
+        """
+        Constructor. Maps the file and checks its header.
+        :param path: The file to open
+        :param header: The header struct the file was written with
+        :param magic: The magic bytes the file has to start with
+        :param kind: The kind of file, for error messages
+        """
+        with open(path, "rb") as f:
+            self.mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.buffer = memoryview(self.mapping)
+        fields = header.unpack_from(self.buffer)
+        if fields[0] != magic:
+            raise ValueError("{} is not a {} file".format(path, kind))
+        if fields[1] != _BYTE_ORDER:
+            raise ValueError("{} was written on a machine with a different byte order".format(path))
+        self.fields = fields[2:]
+        self.position = header.size
+
+    def section(self, size: int, fmt: str = None) -> memoryview:
+        """
+        Returns the next section.
+        :param size: The size of the section in bytes, without the padding
+        :param fmt: The `struct` format to cast the section to. Raw bytes if not passed
+        :return: A view into the mapping
+        """
+        start = self.position
+        self.position = start + size + (-size % 8)
+        view = self.buffer[start:start + size]
+        return view if fmt is None else view.cast(fmt)
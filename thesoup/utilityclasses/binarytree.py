@@ -1,10 +1,16 @@
 from abc import ABC, abstractmethod
+from bisect import bisect_left, bisect_right, insort
+from heapq import merge
+from itertools import accumulate, chain, islice
 
 
 class _BinaryTreeElement:
+    __slots__ = ["val", "count", "size", "right", "left", "parent"]
+
     def __init__(self, val):
         self.val = val
         self.count = 1
+        self.size = 1
         self.right = None
         self.left = None
         self.parent = None
@@ -71,28 +77,99 @@ class BinaryTree (ABC):
 
 class BinarySearchTree (BinaryTree):
     """
-    A BST implementation of a binary tree
+    A BST implementation of a binary tree. Repeated items are kept in a single node with a count, and deleting an
+    item removes one occurrence of it.
+
+    Every node also keeps the number of elements in its subtree, which allows order statistics (`rank`, `select`)
+    and range queries (`range`, `count_range`, `floor`, `ceiling`) in time proportional to the depth of the tree. Use
+    `AVLTree` to keep that logarithmic.
     """
+    _element_type = _BinaryTreeElement
+
     def __init__(self):
         self.root = None
         self.num = 0
 
     @staticmethod
-    def _insert(root: _BinaryTreeElement, element):
-        if element > root():
-            if root.right is not None:
-                BinarySearchTree._insert(root.right, element)
+    def _update(node: _BinaryTreeElement):
+        node.size = node.count + BinarySearchTree._size(node.left) + BinarySearchTree._size(node.right)
+
+    def _build(self, values: list, counts: list, lo: int, hi: int, parent: _BinaryTreeElement):
+        if lo >= hi:
+            return None
+        mid = (lo + hi) // 2
+        node = self._element_type(values[mid])
+        node.count = counts[mid]
+        node.parent = parent
+        node.left = self._build(values, counts, lo, mid, node)
+        node.right = self._build(values, counts, mid + 1, hi, node)
+        self._update(node)
+        return node
+
+    @classmethod
+    def from_sorted(cls, iterable):
+        """
+        Builds a perfectly balanced tree out of sorted items in `O(n)`, without comparing them against the tree.
+        Repeated items are folded into a single node, as `insert` would.
+
+        :param iterable: The items, in ascending order
+        :return: The tree
+        """
+        values = list()
+        counts = list()
+        for item in iterable:
+            if len(values) > 0 and item == values[-1]:
+                counts[-1] += 1
+            elif len(values) > 0 and item < values[-1]:
+                raise ValueError("Items are not sorted: {} comes after {}".format(item, values[-1]))
             else:
-                root.right = _BinaryTreeElement(element)
-                root.right.parent = root
-        elif element < root():
-            if root.left is not None:
-                BinarySearchTree._insert(root.left, element)
+                values.append(item)
+                counts.append(1)
+        tree = cls()
+        tree.root = tree._build(values, counts, 0, len(values), None)
+        tree.num = sum(counts)
+        return tree
+
+    @classmethod
+    def from_iterable(cls, iterable):
+        """
+        Builds a balanced tree out of items in any order, by sorting them and then calling `from_sorted`.
+
+        :param iterable: The items
+        :return: The tree
+        """
+        return cls.from_sorted(sorted(iterable))
+
+    def merge(self, other: BinaryTree):
+        """
+        Returns a new, balanced tree with the elements of both trees, in `O(n + m)`. Neither tree is modified.
+
+        :param other: Any binary tree
+        :return: A tree of the same type as this one
+        """
+        return type(self).from_sorted(merge(iter(self), iter(other)))
+
+    @staticmethod
+    def _insert(root: _BinaryTreeElement, element):
+        while True:
+            root.size += 1
+            if element > root():
+                if root.right is not None:
+                    root = root.right
+                else:
+                    root.right = _BinaryTreeElement(element)
+                    root.right.parent = root
+                    return
+            elif element < root():
+                if root.left is not None:
+                    root = root.left
+                else:
+                    root.left = _BinaryTreeElement(element)
+                    root.left.parent = root
+                    return
             else:
-                root.left = _BinaryTreeElement(element)
-                root.left.parent = root
-        else:
-            root.count += 1
+                root.count += 1
+                return
 
     @staticmethod
     def _search(root: _BinaryTreeElement, item):
@@ -121,24 +198,46 @@ class BinarySearchTree (BinaryTree):
         return iterator
 
     @staticmethod
-    def _hard_delete(item: _BinaryTreeElement):
-        if item.left is not None:
-            max_left = BinarySearchTree._max(item.left)
-            item.val = max_left.val
-            item.count = max_left.count
-            BinarySearchTree._hard_delete(max_left)
-        elif item.right is not None:
-            min_right = BinarySearchTree._min(item.right)
-            item.val = min_right.val
-            item.count = min_right.count
-            BinarySearchTree._hard_delete(min_right)
+    def _hard_delete(item: _BinaryTreeElement) -> _BinaryTreeElement:
+        """
+        Removes a node that is not the root of a single node tree, and returns the parent of the node that was
+        physically unlinked. Only the sizes on the way from there up to the root need fixing.
+        """
+        while item.left is not None or item.right is not None:
+            if item.left is not None:
+                replacement = BinarySearchTree._max(item.left)
+            else:
+                replacement = BinarySearchTree._min(item.right)
+            item.val = replacement.val
+            item.count = replacement.count
+            item = replacement
+        parent = item.parent
+        if parent.left is item:
+            parent.left = None
         else:
-            if item() < item.parent():
-                item.parent.left = None
-                del item
+            parent.right = None
+        return parent
+
+    @staticmethod
+    def _size(node: _BinaryTreeElement) -> int:
+        return 0 if node is None else node.size
+
+    @staticmethod
+    def _update_sizes(node: _BinaryTreeElement):
+        while node is not None:
+            BinarySearchTree._update(node)
+            node = node.parent
+
+    @staticmethod
+    def _ceiling_node(root: _BinaryTreeElement, item) -> _BinaryTreeElement:
+        candidate = None
+        while root is not None:
+            if item > root():
+                root = root.right
             else:
-                item.parent.right = None
-                del item
+                candidate = root
+                root = root.left
+        return candidate
 
     @staticmethod
     def _next(root: _BinaryTreeElement):
@@ -168,16 +267,98 @@ class BinarySearchTree (BinaryTree):
         return BinarySearchTree._search(self.root, item) is not None
 
     def __delitem__(self, key):
-        # Special case for root
-        if key == self.root() and len(self) == 1:
-            tmp = self.root
-            self.root = None
-            del tmp
-            self.num = 0
         item = BinarySearchTree._search(self.root, key)
-        if item is not None:
-            BinarySearchTree._hard_delete(item)
-            self.num -= 1
+        if item is None:
+            return
+        self.num -= 1
+        if item.count > 1:
+            item.count -= 1
+            BinarySearchTree._update_sizes(item)
+        elif item is self.root and item.left is None and item.right is None:
+            self.root = None
+        else:
+            BinarySearchTree._update_sizes(BinarySearchTree._hard_delete(item))
+
+    def rank(self, item) -> int:
+        """
+        Returns the number of elements in the tree that are smaller than `item`. `O(depth)`.
+
+        :param item: The item. It does not have to be in the tree
+        :return: The rank
+        """
+        node = self.root
+        rank = 0
+        while node is not None:
+            if item > node():
+                rank += BinarySearchTree._size(node.left) + node.count
+                node = node.right
+            elif item < node():
+                node = node.left
+            else:
+                return rank + BinarySearchTree._size(node.left)
+        return rank
+
+    def select(self, k: int):
+        """
+        Returns the `k`th smallest element of the tree, counting from 0 and counting repeated elements as many times as
+        they were inserted. `O(depth)`.
+
+        :param k: The index
+        :return: The element
+        """
+        if k < 0 or k >= len(self):
+            raise IndexError("Index {} out of range for a tree of {} elements".format(k, len(self)))
+        node = self.root
+        while True:
+            left_size = BinarySearchTree._size(node.left)
+            if k < left_size:
+                node = node.left
+            elif k < left_size + node.count:
+                return node()
+            else:
+                k -= left_size + node.count
+                node = node.right
+
+    def floor(self, item):
+        """
+        Returns the largest element that is less than or equal to `item`, or None if there is none.
+        """
+        node = self.root
+        candidate = None
+        while node is not None:
+            if item < node():
+                node = node.left
+            else:
+                candidate = node
+                node = node.right
+        return None if candidate is None else candidate()
+
+    def ceiling(self, item):
+        """
+        Returns the smallest element that is greater than or equal to `item`, or None if there is none.
+        """
+        node = BinarySearchTree._ceiling_node(self.root, item)
+        return None if node is None else node()
+
+    def range(self, lo, hi):
+        """
+        A generator over the elements in `[lo, hi)`, in order. Finding the first one is `O(depth)`.
+
+        :param lo: The inclusive lower bound
+        :param hi: The exclusive upper bound
+        :return: A generator of elements
+        """
+        node = BinarySearchTree._ceiling_node(self.root, lo)
+        while node is not None and node() < hi:
+            for _ in range(node.count):
+                yield node()
+            node = BinarySearchTree._next(node)
+
+    def count_range(self, lo, hi) -> int:
+        """
+        Returns the number of elements in `[lo, hi)`. `O(depth)`.
+        """
+        return max(0, self.rank(hi) - self.rank(lo))
 
     def __iter__(self):
         class _BinarySearchTreeIterator:
@@ -185,6 +366,9 @@ class BinarySearchTree (BinaryTree):
                 self.pos = root
                 self.pos_count = root.count
 
+            def __iter__(self):
+                return self
+
             def __next__(self):
                 if self.pos is None:
                     raise StopIteration()
@@ -198,8 +382,284 @@ class BinarySearchTree (BinaryTree):
                         self.pos_count = self.pos.count
                     return tmp()
 
+        if self.root is None:
+            return iter([])
         return _BinarySearchTreeIterator(
             BinarySearchTree._min(
                 self.root
             )
-        )
\ No newline at end of file
+        )
+
+
+class _AVLTreeElement (_BinaryTreeElement):
+    __slots__ = ["height"]
+
+    def __init__(self, val):
+        super().__init__(val)
+        self.height = 1
+
+
+class AVLTree (BinarySearchTree):
+    """
+    A self-balancing BST. Every node keeps the height of its subtree, and inserts and deletes rotate the nodes on the
+    way back up to keep the heights of the 2 subtrees of any node within 1 of each other. This keeps the depth of the
+    tree under `1.44 log(n)` whatever the order of insertion, so sorted input does not degrade it to a linked list.
+
+    Like `BinarySearchTree`, repeated items are kept in a single node with a count. Deleting an item removes one
+    occurrence of it.
+    """
+    _element_type = _AVLTreeElement
+
+    @staticmethod
+    def _height(node: _AVLTreeElement) -> int:
+        return 0 if node is None else node.height
+
+    @staticmethod
+    def _update(node: _AVLTreeElement):
+        node.height = 1 + max(AVLTree._height(node.left), AVLTree._height(node.right))
+        node.size = node.count + BinarySearchTree._size(node.left) + BinarySearchTree._size(node.right)
+
+    def _replace_child(self, parent: _AVLTreeElement, old: _AVLTreeElement, new: _AVLTreeElement):
+        if parent is None:
+            self.root = new
+        elif parent.left is old:
+            parent.left = new
+        else:
+            parent.right = new
+        if new is not None:
+            new.parent = parent
+
+    def _rotate_left(self, node: _AVLTreeElement) -> _AVLTreeElement:
+        pivot = node.right
+        node.right = pivot.left
+        if pivot.left is not None:
+            pivot.left.parent = node
+        self._replace_child(node.parent, node, pivot)
+        pivot.left = node
+        node.parent = pivot
+        self._update(node)
+        self._update(pivot)
+        return pivot
+
+    def _rotate_right(self, node: _AVLTreeElement) -> _AVLTreeElement:
+        pivot = node.left
+        node.left = pivot.right
+        if pivot.right is not None:
+            pivot.right.parent = node
+        self._replace_child(node.parent, node, pivot)
+        pivot.right = node
+        node.parent = pivot
+        self._update(node)
+        self._update(pivot)
+        return pivot
+
+    def _rebalance(self, node: _AVLTreeElement):
+        """
+        Walks from `node` up to the root, fixing heights and rotating wherever the balance is off by 2.
+        """
+        while node is not None:
+            AVLTree._update(node)
+            balance = AVLTree._height(node.left) - AVLTree._height(node.right)
+            if balance > 1:
+                if AVLTree._height(node.left.left) < AVLTree._height(node.left.right):
+                    self._rotate_left(node.left)
+                node = self._rotate_right(node)
+            elif balance < -1:
+                if AVLTree._height(node.right.right) < AVLTree._height(node.right.left):
+                    self._rotate_right(node.right)
+                node = self._rotate_left(node)
+            node = node.parent
+
+    def insert(self, item):
+        self.num += 1
+        if self.root is None:
+            self.root = _AVLTreeElement(item)
+            return
+        node = self.root
+        while True:
+            if item == node():
+                node.count += 1
+                BinarySearchTree._update_sizes(node)
+                return
+            child = node.right if item > node() else node.left
+            if child is None:
+                break
+            node = child
+        child = _AVLTreeElement(item)
+        child.parent = node
+        if item > node():
+            node.right = child
+        else:
+            node.left = child
+        self._rebalance(node)
+
+    def __delitem__(self, key):
+        node = BinarySearchTree._search(self.root, key)
+        if node is None:
+            return
+        self.num -= 1
+        if node.count > 1:
+            node.count -= 1
+            BinarySearchTree._update_sizes(node)
+            return
+        if node.left is not None and node.right is not None:
+            successor = BinarySearchTree._min(node.right)
+            node.val = successor.val
+            node.count = successor.count
+            node = successor
+        child = node.left if node.left is not None else node.right
+        parent = node.parent
+        self._replace_child(parent, node, child)
+        self._rebalance(parent)
+
+
+class SortedListTree (BinaryTree):
+    """
+    An ordered container with the `BinaryTree` interface, stored as a list of sorted lists (the approach of the
+    `sortedcontainers` package) instead of linked nodes. Each sublist holds between `load / 2` and `2 * load`
+    elements, and a separate list keeps the largest element of every sublist, so locating an element is 2 binary
+    searches with `bisect`. Elements sit next to each other in plain lists, which takes a fraction of the memory of
+    tree nodes and iterates at the speed of a list.
+
+    Repeated items are stored as separate entries, and deleting an item removes one occurrence of it. It supports the
+    same order statistics and range queries as `BinarySearchTree`.
+    """
+    DEFAULT_LOAD = 1000
+
+    def __init__(self, load: int = DEFAULT_LOAD):
+        """
+        Constructor.
+        :param load: The target size of the sublists
+        """
+        self.load = load
+        self.lists = list()
+        self.maxes = list()
+        self.num = 0
+        self._offsets = None
+
+    def _locate(self, item) -> (int, int):
+        """
+        Returns (sublist, position) of the first element that is not smaller than `item`, or (len(lists), 0).
+        """
+        pos = bisect_left(self.maxes, item)
+        if pos == len(self.maxes):
+            return pos, 0
+        return pos, bisect_left(self.lists[pos], item)
+
+    def _offset(self, pos: int) -> int:
+        """
+        Returns the number of elements in the sublists before `pos`. The running totals are rebuilt lazily after a
+        change, in `O(n / load)`.
+        """
+        if self._offsets is None:
+            self._offsets = [0] + list(accumulate(map(len, self.lists)))
+        return self._offsets[pos]
+
+    def insert(self, item):
+        self.num += 1
+        self._offsets = None
+        if len(self.lists) == 0:
+            self.lists.append([item])
+            self.maxes.append(item)
+            return
+        pos = bisect_right(self.maxes, item)
+        if pos == len(self.maxes):
+            pos -= 1
+            self.lists[pos].append(item)
+            self.maxes[pos] = item
+        else:
+            insort(self.lists[pos], item)
+        if len(self.lists[pos]) > 2 * self.load:
+            sublist = self.lists[pos]
+            half = len(sublist) // 2
+            self.lists[pos:pos + 1] = [sublist[:half], sublist[half:]]
+            self.maxes[pos:pos + 1] = [sublist[half - 1], sublist[-1]]
+
+    def __contains__(self, item):
+        pos, idx = self._locate(item)
+        return pos < len(self.lists) and self.lists[pos][idx] == item
+
+    def __delitem__(self, key):
+        pos, idx = self._locate(key)
+        if pos == len(self.lists) or self.lists[pos][idx] != key:
+            return
+        self.num -= 1
+        self._offsets = None
+        sublist = self.lists[pos]
+        del sublist[idx]
+        if len(sublist) > 0:
+            self.maxes[pos] = sublist[-1]
+        if len(sublist) < self.load // 2 and len(self.lists) > 1:
+            # Merge with a neighbour, and split again if that made it too long
+            pos = pos if pos + 1 < len(self.lists) else pos - 1
+            merged = self.lists[pos] + self.lists[pos + 1]
+            if len(merged) > 2 * self.load:
+                half = len(merged) // 2
+                self.lists[pos:pos + 2] = [merged[:half], merged[half:]]
+                self.maxes[pos:pos + 2] = [merged[half - 1], merged[-1]]
+            else:
+                self.lists[pos:pos + 2] = [merged]
+                self.maxes[pos:pos + 2] = [merged[-1]]
+        elif len(sublist) == 0:
+            del self.lists[pos]
+            del self.maxes[pos]
+
+    def __len__(self):
+        return self.num
+
+    def __iter__(self):
+        return chain.from_iterable(self.lists)
+
+    def rank(self, item) -> int:
+        """
+        Returns the number of elements in the tree that are smaller than `item`.
+        """
+        pos, idx = self._locate(item)
+        return self.num if pos == len(self.lists) else self._offset(pos) + idx
+
+    def select(self, k: int):
+        """
+        Returns the `k`th smallest element, counting from 0.
+        """
+        if k < 0 or k >= self.num:
+            raise IndexError("Index {} out of range for a tree of {} elements".format(k, self.num))
+        self._offset(0)
+        pos = bisect_right(self._offsets, k) - 1
+        return self.lists[pos][k - self._offsets[pos]]
+
+    def floor(self, item):
+        """
+        Returns the largest element that is less than or equal to `item`, or None if there is none.
+        """
+        pos = bisect_right(self.maxes, item)
+        if pos < len(self.lists):
+            idx = bisect_right(self.lists[pos], item)
+            if idx > 0:
+                return self.lists[pos][idx - 1]
+        return self.maxes[pos - 1] if pos > 0 else None
+
+    def ceiling(self, item):
+        """
+        Returns the smallest element that is greater than or equal to `item`, or None if there is none.
+        """
+        pos, idx = self._locate(item)
+        return None if pos == len(self.lists) else self.lists[pos][idx]
+
+    def range(self, lo, hi):
+        """
+        A generator over the elements in `[lo, hi)`, in order.
+        """
+        pos, idx = self._locate(lo)
+        for sublist in islice(self.lists, pos, None):
+            if sublist[-1] < hi:
+                yield from islice(sublist, idx, None)
+            else:
+                yield from islice(sublist, idx, bisect_left(sublist, hi))
+                return
+            idx = 0
+
+    def count_range(self, lo, hi) -> int:
+        """
+        Returns the number of elements in `[lo, hi)`.
+        """
+        return max(0, self.rank(hi) - self.rank(lo))
@@ -1,26 +1,88 @@
 class DisjointSets:
     """
-    This class implements the disjoint sets data structure.
+    This class implements the disjoint sets data structure, as a union-find forest. Every item points to a parent, and
+    the root of its tree is the representative of its set. `find_set` compresses the paths it walks and `union` hangs
+    the smaller tree under the larger one, so both run in near constant amortized time.
+
+    The members of each set are not stored. `members` and `groups` work them out when asked for, and cache the result
+    until the next successful union. They return copies, so changing the result does not affect the cache.
     """
     def __init__(self, items: list):
-        self.set_map = dict(
+        self.parents = dict(
             [(item, item) for item in items]
         )
-        self.sets = dict(
-            [(item, {item}) for item in items]
+        self.sizes = dict(
+            [(item, 1) for item in self.parents.keys()]
         )
+        self.num_sets = len(self.parents)
+        self._groups = None
 
     def find_set(self, item):
-        return self.set_map[item]
+        """
+        Returns the representative of the set an item belongs to.
+        :param item: The item
+        :return: The representative
+        """
+        parents = self.parents
+        root = item
+        while parents[root] != root:
+            root = parents[root]
+        while parents[item] != root:
+            parents[item], item = root, parents[item]
+        return root
+
+    def union(self, item1, item2) -> bool:
+        """
+        Merges the sets of 2 items. If both sets are the same size, the representative of `item1`'s set stays the
+        representative. Otherwise the representative of the larger set does.
+        :param item1: An item
+        :param item2: Another item
+        :return: True if they were in different sets
+        """
+        dest_set = self.find_set(item1)
+        src_set = self.find_set(item2)
+        if src_set == dest_set:
+            return False
+        if self.sizes[dest_set] < self.sizes[src_set]:
+            dest_set, src_set = src_set, dest_set
+        self.parents[src_set] = dest_set
+        self.sizes[dest_set] += self.sizes.pop(src_set)
+        self.num_sets -= 1
+        self._groups = None
+        return True
+
+    def union_many(self, pairs) -> int:
+        """
+        Merges the sets of every pair of items in an iterable, for example the endpoints of a batch of edges.
+        :param pairs: An iterable of (item1, item2) tuples
+        :return: The number of pairs that merged 2 different sets
+        """
+        return sum(map(lambda pair: self.union(pair[0], pair[1]), pairs))
+
+    def groups(self) -> dict:
+        """
+        Returns every set, as a dictionary of representative vs set of members.
+        """
+        return dict([(root, set(group)) for root, group in self._cached_groups().items()])
+
+    def _cached_groups(self) -> dict:
+        if self._groups is None:
+            groups = dict()
+            for item in self.parents.keys():
+                root = self.find_set(item)
+                if root not in groups:
+                    groups[root] = set()
+                groups[root].add(item)
+            self._groups = groups
+        return self._groups
 
-    def union(self, item1, item2):
-        dest_set = self.set_map[item1]
-        src_set = self.set_map[item2]
-        if src_set != dest_set:
-            for item in self.sets[src_set]:
-                self.set_map[item] = self.set_map[dest_set]
-                self.sets[dest_set].add(item)
-            del self.sets[src_set]
+    def members(self, item) -> set:
+        """
+        Returns the set an item belongs to.
+        :param item: The item
+        :return: A set of items
+        """
+        return set(self._cached_groups()[self.find_set(item)])
 
     def __len__(self):
-        return len(self.sets)
\ No newline at end of file
+        return self.num_sets
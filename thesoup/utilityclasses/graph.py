@@ -1,5 +1,11 @@
 import json
+import struct
+import time
 from abc import ABC, abstractmethod
+from array import array
+from bisect import bisect_left
+from typing import Any, Callable, Iterable, TextIO
+from thesoup.utilityclasses._mappedfile import MappedFile, write_mapped_file
 from thesoup.utilityfunctions.collectionutils import flatten
 
 
@@ -10,6 +16,8 @@ class Edge:
 
     All the 3 members must define the `__str__` and `__eq__` methods.
     """
+    __slots__ = ["src", "destination", "ppt"]
+
     def __init__(self, src, destination, ppt):
         self.src = src
         self.destination = destination
@@ -98,6 +106,22 @@ class MutableGraph (Graph):
         """
         pass
 
+    def add_edges(self, edges: Iterable[Edge]):
+        """
+        Adds a batch of edges. Implementations can override this with something faster than adding them one by one.
+        :param edges: An iterable of `Edge` structs
+        :return:
+        """
+        for edge in edges:
+            self.add_edge(edge)
+
+    def freeze(self) -> 'CSRGraph':
+        """
+        Returns an immutable, compact copy of this graph, backed by arrays in compressed sparse row form.
+        :return: A `CSRGraph`
+        """
+        return CSRGraph.from_graph(self)
+
 
 class AdjListDiGraph (MutableGraph):
     """
@@ -133,6 +157,28 @@ class AdjListDiGraph (MutableGraph):
             ))
         self.storage[edge.src].add((edge.destination, edge.ppt))
 
+    def add_edges(self, edges: Iterable[Edge]):
+        """
+        Adds a batch of edges. All the edges are validated before any is added, so a batch with a bad edge leaves the
+        graph untouched.
+        :param edges: An iterable of `Edge` structs
+        :return:
+        """
+        edges = list(edges)
+        self._validate_edges(edges)
+        storage = self.storage
+        for edge in edges:
+            storage[edge.src].add((edge.destination, edge.ppt))
+
+    def _validate_edges(self, edges: list):
+        storage = self.storage
+        for edge in edges:
+            if edge.src not in storage or edge.destination not in storage:
+                raise ValueError("Either the source ({}) or destination ({}) of the edge is not in the graph".format(
+                    edge.src,
+                    edge.destination
+                ))
+
     def __contains__(self, item):
         """
         {} 
@@ -168,6 +214,84 @@ class AdjListDiGraph (MutableGraph):
 
         return graph
 
+    @classmethod
+    def from_edge_list_file(
+            cls,
+            fp: TextIO,
+            delimiter: str = None,
+            batch_size: int = 100000,
+            progress_callback: Callable[[int, float], type(None)] = None):
+        """
+        Loads a graph from a text file with one edge per line: `source destination [property]`, separated by
+        `delimiter` (any whitespace by default). Blank lines and lines starting with `#` are skipped. Properties that
+        look like ints or floats are converted, anything else is kept as a string. Vertices are added as they are
+        seen. The file is read line by line and edges are inserted in batches with `add_edges`, so memory stays
+        bounded by the size of the graph plus one batch.
+
+        :param fp: A file object opened in text mode
+        :param delimiter: The field separator
+        :param batch_size: The number of edges to insert at a time
+        :param progress_callback: Called after every batch as callable(edges loaded so far, seconds elapsed)
+        :return: The graph
+        """
+        def _items():
+            for line in fp:
+                line = line.strip()
+                if len(line) == 0 or line.startswith("#"):
+                    continue
+                fields = line.split(delimiter)
+                if len(fields) not in (2, 3):
+                    raise ValueError("'{}' is not an edge".format(line))
+                yield Edge(fields[0], fields[1], _parse_ppt(fields[2]) if len(fields) == 3 else None)
+
+        return _load_batches(cls(), _items(), batch_size, progress_callback)
+
+    @classmethod
+    def from_jsonl(
+            cls,
+            fp: TextIO,
+            batch_size: int = 100000,
+            progress_callback: Callable[[int, float], type(None)] = None):
+        """
+        Loads a graph from a file with one JSON object per line, each in the same format as `from_json`. A vertex can
+        appear on more than one line, and destinations do not need to have been declared yet.
+
+        :param fp: A file object opened in text mode
+        :param batch_size: The number of edges to insert at a time
+        :param progress_callback: Called after every batch as callable(edges loaded so far, seconds elapsed)
+        :return: The graph
+        """
+        def _items():
+            for line in fp:
+                if len(line.strip()) == 0:
+                    continue
+                for v, edges in json.loads(line).items():
+                    yield v
+                    for e in edges:
+                        yield _json_edge(v, e)
+
+        return _load_batches(cls(), _items(), batch_size, progress_callback)
+
+    @classmethod
+    def from_json_stream(
+            cls,
+            fp: TextIO,
+            chunk_size: int = 1 << 20,
+            batch_size: int = 100000,
+            progress_callback: Callable[[int, float], type(None)] = None):
+        """
+        Loads a graph from a file in the same format as `from_json`, without reading the whole document. The file is
+        read `chunk_size` characters at a time and parsed one edge at a time, so even a vertex with millions of edges
+        does not have to fit in memory as a parsed list. Destinations do not need to have been declared yet.
+
+        :param fp: A file object opened in text mode
+        :param chunk_size: The number of characters to read at a time
+        :param batch_size: The number of edges to insert at a time
+        :param progress_callback: Called after every batch as callable(edges loaded so far, seconds elapsed)
+        :return: The graph
+        """
+        return _load_batches(cls(), _JsonAdjacencyStream(fp, chunk_size), batch_size, progress_callback)
+
 
 class AdjListUndirectedDiGraph (AdjListDiGraph):
     """
@@ -186,6 +310,17 @@ class AdjListUndirectedDiGraph (AdjListDiGraph):
         self.storage[edge.src].add((edge.destination, edge.ppt))
         self.storage[edge.destination].add((edge.src, edge.ppt))
 
+    def add_edges(self, edges: Iterable[Edge]):
+        edges = list(edges)
+        self._validate_edges(edges)
+        storage = self.storage
+        for edge in edges:
+            storage[edge.src].add((edge.destination, edge.ppt))
+            storage[edge.destination].add((edge.src, edge.ppt))
+
+    def freeze(self) -> 'CSRGraph':
+        return CSRGraph.from_graph(self, directed=False)
+
     def edges(self) -> set:
         return set(
             flatten(
@@ -207,3 +342,417 @@ class AdjListUndirectedDiGraph (AdjListDiGraph):
 
         return graph
 
+
+def _parse_ppt(field: str):
+    for parser in [int, float]:
+        try:
+            return parser(field)
+        except ValueError:
+            pass
+    return field
+
+
+def _json_edge(src, item) -> Edge:
+    return Edge(src, item[0], item[1]) if type(item) == list else Edge(src, item, None)
+
+
+def _load_batches(graph: MutableGraph, items: Iterable, batch_size: int, progress_callback) -> MutableGraph:
+    """
+    Drains an iterable of vertices and `Edge`s into a graph, adding the edges `batch_size` at a time with `add_edges`.
+    """
+    start = time.perf_counter()
+    loaded = 0
+    batch = list()
+
+    def _flush():
+        for edge in batch:
+            graph.add_vertex(edge.src)
+            graph.add_vertex(edge.destination)
+        graph.add_edges(batch)
+        batch.clear()
+        if progress_callback is not None:
+            progress_callback(loaded, time.perf_counter() - start)
+
+    for item in items:
+        if type(item) == Edge:
+            batch.append(item)
+            loaded += 1
+            if len(batch) >= batch_size:
+                _flush()
+        else:
+            graph.add_vertex(item)
+    if len(batch) > 0:
+        _flush()
+    return graph
+
+
+class _JsonAdjacencyStream:
+    """
+    Incremental parser for the `from_json` format. Iterating over it yields each vertex when its key is read, and an
+    `Edge` for each element of its edge list, reading more of the file only when the buffer runs out.
+    """
+    WHITESPACE = " \t\n\r"
+
+    def __init__(self, fp: TextIO, chunk_size: int):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.fp.read(self.chunk_size)
+        if len(chunk) == 0:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def _next_char(self) -> str:
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _JsonAdjacencyStream.WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON input")
+
+    def _expect(self, chars: str) -> str:
+        char = self._next_char()
+        if char not in chars:
+            raise ValueError("Expected one of '{}' but found '{}' in JSON input".format(chars, char))
+        self.pos += 1
+        return char
+
+    def _value(self) -> Any:
+        self._next_char()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+                # A number that ends with the buffer might continue in the next chunk
+                if end < len(self.buffer) or not self._fill():
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+
+    def __iter__(self):
+        self._expect("{")
+        if self._next_char() == "}":
+            return
+        while True:
+            v = self._value()
+            yield v
+            self._expect(":")
+            self._expect("[")
+            if self._next_char() == "]":
+                self.pos += 1
+            else:
+                while True:
+                    yield _json_edge(v, self._value())
+                    if self._expect(",]") == "]":
+                        break
+            if self._expect(",}") == "}":
+                return
+
+
+def _pack_weights(ppts: list):
+    """
+    Packs edge properties into the most compact container that holds them: nothing if there are no properties, a
+    typed array if they are all ints or all floats, and a plain list otherwise. Mixed ints and floats are not packed
+    into a float array, since that would change how the edges hash.
+    """
+    if all(ppt is None for ppt in ppts):
+        return None
+    if all(type(ppt) == int for ppt in ppts):
+        try:
+            return array("q", ppts)
+        except OverflowError:
+            return list(ppts)
+    if all(type(ppt) == float for ppt in ppts):
+        return array("d", ppts)
+    return list(ppts)
+
+
+class CSRGraph (Graph):
+    """
+    An immutable graph stored in compressed sparse row form. Vertices are numbered `0 .. n-1`, and the outgoing edges
+    of vertex `i` are `targets[offsets[i]:offsets[i+1]]`, with the matching edge properties at the same positions in
+    `weights`. All three are flat arrays, so an edge costs 8 bytes for the target and 8 bytes for a numeric property,
+    instead of a tuple inside a set.
+
+    If `labels` is given, `labels[i]` is the vertex that id `i` stands for, and the `Graph` interface speaks in labels.
+    Otherwise the vertices are the integer ids themselves.
+
+    Build one with `freeze()` on any `MutableGraph`, or `CSRGraph.from_graph` on any `Graph`. It can be saved with
+    `to_file` and opened again with `from_file`, which memory-maps the file instead of reading it.
+    """
+    def __init__(self, offsets, targets, weights=None, labels=None, directed: bool = True, ids=None):
+        """
+        Constructor.
+        :param offsets: Sequence of `n + 1` ints, indexing into `targets`
+        :param targets: Sequence of destination vertex ids
+        :param weights: Sequence of edge properties parallel to `targets`, or None if the edges have no properties
+        :param labels: Sequence of vertex labels indexed by id, or None if the vertices are the ids
+        :param directed: False if every edge is stored in both directions, in which case `edges` reports each once
+        :param ids: Lookup from label to id with a `get` method. Built as a dict from `labels` if not given
+        """
+        if len(offsets) == 0 or offsets[-1] != len(targets):
+            raise ValueError("Offsets do not describe {} targets".format(len(targets)))
+        if weights is not None and len(weights) != len(targets):
+            raise ValueError("There are {} weights for {} targets".format(len(weights), len(targets)))
+        if labels is not None and len(labels) != len(offsets) - 1:
+            raise ValueError("There are {} labels for {} vertices".format(len(labels), len(offsets) - 1))
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.labels = labels
+        if labels is not None and ids is None:
+            ids = dict([(label, idx) for idx, label in enumerate(labels)])
+        self.ids = ids
+        self.directed = directed
+        self._mapping = None
+
+    def num_vertices(self) -> int:
+        return len(self.offsets) - 1
+
+    def num_edges(self) -> int:
+        return len(self.targets)
+
+    def vertex_id(self, item):
+        """
+        Returns the integer id of a vertex, or None if it is not in the graph
+        :param item: The vertex
+        :return: The id
+        """
+        if self.ids is not None:
+            return self.ids.get(item)
+        if type(item) == int and 0 <= item < len(self.offsets) - 1:
+            return item
+        return None
+
+    def vertex_label(self, idx: int):
+        """
+        Returns the vertex that an integer id stands for
+        :param idx: The id
+        :return: The vertex
+        """
+        return idx if self.labels is None else self.labels[idx]
+
+    def get_neighbour_ids(self, idx: int):
+        """
+        Returns the ids of the neighbours of the vertex with id `idx`, without translating them to labels.
+        :param idx: The id
+        :return: A slice of the targets array
+        """
+        return self.targets[self.offsets[idx]:self.offsets[idx + 1]]
+
+    def get_neighbours(self, item) -> list:
+        idx = self.vertex_id(item)
+        if idx is None:
+            return None
+        lo, hi = self.offsets[idx], self.offsets[idx + 1]
+        targets = self.targets[lo:hi]
+        if self.labels is not None:
+            labels = self.labels
+            targets = [labels[t] for t in targets]
+        weights = [None] * (hi - lo) if self.weights is None else self.weights[lo:hi]
+        return list(zip(targets, weights))
+
+    def __contains__(self, item):
+        if type(item) == Edge:
+            neighbours = self.get_neighbours(item.src)
+            return neighbours is not None and (item.destination, item.ppt) in neighbours
+        else:
+            return self.vertex_id(item) is not None
+
+    def vertices(self) -> set:
+        return set(range(len(self.offsets) - 1)) if self.labels is None else set(self.labels)
+
+    def edges(self) -> set:
+        edges = set()
+        for idx in range(len(self.offsets) - 1):
+            v = self.vertex_label(idx)
+            for destination, ppt in self.get_neighbours(v):
+                if self.directed or destination > v:
+                    edges.add(Edge(v, destination, ppt))
+                else:
+                    edges.add(Edge(destination, v, ppt))
+        return edges
+
+    @staticmethod
+    def from_graph(graph: Graph, directed: bool = True) -> 'CSRGraph':
+        """
+        Builds a `CSRGraph` out of any `Graph`. If the vertices are exactly the ints `0 .. n-1` they are used as ids
+        directly, otherwise they are numbered in sorted order (or iteration order, if they cannot be sorted).
+        :param graph: The graph to copy
+        :param directed: False if `graph` stores every edge in both directions
+        :return: The frozen graph
+        """
+        vertices = graph.vertices()
+        try:
+            labels = sorted(vertices)
+        except TypeError:
+            labels = list(vertices)
+        if all(type(v) == int for v in labels) and labels == list(range(len(labels))):
+            ids = None
+        else:
+            ids = dict([(label, idx) for idx, label in enumerate(labels)])
+
+        offsets = array("q", [0])
+        targets = array("q")
+        ppts = list()
+        for v in labels:
+            for destination, ppt in graph.get_neighbours(v):
+                targets.append(destination if ids is None else ids[destination])
+                ppts.append(ppt)
+            offsets.append(len(targets))
+
+        return CSRGraph(offsets, targets, _pack_weights(ppts), None if ids is None else labels, directed)
+
+    def to_file(self, path: str):
+        """
+        Writes the graph to a binary file that `from_file` can memory-map. The layout is a fixed header followed by the
+        offsets, targets and weights arrays and a vertex table, each section aligned to 8 bytes. Vertices in the table
+        are sorted, so that a label can be looked up by binary search without building a dict.
+
+        Only int or str vertices, and int or float edge properties (or none at all) can be written. To write any other
+        `Graph`, freeze it first: `CSRGraph.from_graph(graph).to_file(path)`.
+
+        :param path: The file to write
+        :return:
+        """
+        graph = self
+        if self.labels is not None and not _is_sorted(self.labels):
+            graph = CSRGraph.from_graph(self, self.directed)
+
+        if graph.weights is None:
+            weight_kind, weights = _GRAPH_FILE_NO_WEIGHTS, None
+        elif _is_typed(graph.weights, "q"):
+            weight_kind, weights = _GRAPH_FILE_INT_WEIGHTS, graph.weights
+        elif _is_typed(graph.weights, "d"):
+            weight_kind, weights = _GRAPH_FILE_FLOAT_WEIGHTS, graph.weights
+        else:
+            raise ValueError("Only int or float edge properties can be written to a graph file")
+
+        labels = graph.labels
+        label_blob = b""
+        if labels is None:
+            label_kind, label_table = _GRAPH_FILE_NO_LABELS, None
+        elif all(type(label) == int for label in labels):
+            label_kind, label_table = _GRAPH_FILE_INT_LABELS, array("q", labels)
+        elif all(type(label) == str for label in labels):
+            label_kind = _GRAPH_FILE_STR_LABELS
+            encoded = [label.encode("utf-8") for label in labels]
+            label_table = array("q", [0])
+            for label in encoded:
+                label_table.append(label_table[-1] + len(label))
+            label_blob = b"".join(encoded)
+        else:
+            raise ValueError("Only int or str vertices can be written to a graph file")
+
+        write_mapped_file(
+            path,
+            _GRAPH_FILE_HEADER,
+            _GRAPH_FILE_MAGIC,
+            (
+                1 if graph.directed else 0,
+                label_kind,
+                weight_kind,
+                graph.num_vertices(),
+                graph.num_edges(),
+                len(label_blob)
+            ),
+            [
+                None if section is None else memoryview(_as_typed(section, "q"))
+                for section in [graph.offsets, graph.targets, weights, label_table]
+            ] + [label_blob]
+        )
+
+    @staticmethod
+    def from_file(path: str) -> 'CSRGraph':
+        """
+        Opens a graph written by `to_file`. The file is memory-mapped read only, and the arrays of the returned graph
+        are views into the mapping, so opening is independent of the size of the graph and pages are only read from
+        disk when they are touched. The mapping lives as long as the returned graph.
+
+        :param path: The file to open
+        :return: The graph
+        """
+        mapped = MappedFile(path, _GRAPH_FILE_HEADER, _GRAPH_FILE_MAGIC, "graph")
+        directed, label_kind, weight_kind, n, m, blob_size = mapped.fields
+
+        offsets = mapped.section(8 * (n + 1), "q")
+        targets = mapped.section(8 * m, "q")
+        weights = None
+        if weight_kind == _GRAPH_FILE_INT_WEIGHTS:
+            weights = mapped.section(8 * m, "q")
+        elif weight_kind == _GRAPH_FILE_FLOAT_WEIGHTS:
+            weights = mapped.section(8 * m, "d")
+
+        labels = None
+        if label_kind == _GRAPH_FILE_INT_LABELS:
+            labels = _MappedLabels(mapped.section(8 * n, "q"))
+        elif label_kind == _GRAPH_FILE_STR_LABELS:
+            labels = _MappedLabels(mapped.section(8 * (n + 1), "q"), mapped.section(blob_size))
+
+        graph = CSRGraph(offsets, targets, weights, labels, directed == 1, labels)
+        graph._mapping = mapped.mapping
+        return graph
+
+
+_GRAPH_FILE_MAGIC = b"SOUPCSR1"
+_GRAPH_FILE_HEADER = struct.Struct("<8sBBBB4xqqq")
+_GRAPH_FILE_NO_LABELS, _GRAPH_FILE_INT_LABELS, _GRAPH_FILE_STR_LABELS = 0, 1, 2
+_GRAPH_FILE_NO_WEIGHTS, _GRAPH_FILE_INT_WEIGHTS, _GRAPH_FILE_FLOAT_WEIGHTS = 0, 1, 2
+
+
+def _is_sorted(seq) -> bool:
+    try:
+        return all(seq[i] <= seq[i + 1] for i in range(len(seq) - 1))
+    except TypeError:
+        return False
+
+
+def _is_typed(seq, typecode: str) -> bool:
+    if type(seq) == array:
+        return seq.typecode == typecode
+    return type(seq) == memoryview and seq.format == typecode
+
+
+def _as_typed(seq, typecode: str):
+    if _is_typed(seq, "q") or _is_typed(seq, "d"):
+        return seq
+    return array(typecode, seq)
+
+
+class _MappedLabels:
+    """
+    The sorted vertex table of a memory-mapped graph file. It decodes labels on access, and stands in for the label to
+    id dict by binary searching over the sorted labels.
+    """
+    def __init__(self, table: memoryview, blob: memoryview = None):
+        self.table = table
+        self.blob = blob
+
+    def __len__(self):
+        return len(self.table) if self.blob is None else len(self.table) - 1
+
+    def __getitem__(self, idx: int):
+        if self.blob is None:
+            return self.table[idx]
+        return str(self.blob[self.table[idx]:self.table[idx + 1]], "utf-8")
+
+    def __iter__(self):
+        return iter(map(self.__getitem__, range(len(self))))
+
+    def get(self, label, default=None):
+        if type(label) != (int if self.blob is None else str):
+            return default
+        idx = bisect_left(self, label)
+        return idx if idx < len(self) and self[idx] == label else default
@@ -1,4 +1,6 @@
+import heapq
 from abc import ABC, abstractmethod
+from typing import Any, Callable, Iterable
 
 
 class Heap (ABC):
@@ -52,12 +54,21 @@ class Heap (ABC):
             parent = Heap._get_parent(curr_idx)
 
         # Bubble down if needed
+        self._sift_down(curr_idx)
+
+    def _sift_down(self, idx: int):
+        curr_idx = idx
         child = self._get_swappable_child(curr_idx)
         while child < len(self.store) and self._compare(self.store[curr_idx].__key__(), self.store[child].__key__()):
             self._swap(curr_idx, child)
             curr_idx = child
             child = self._get_swappable_child(curr_idx)
 
+    @staticmethod
+    def _check_key(elem):
+        if not hasattr(elem, "__key__"):
+            raise TypeError("{} does not define the __key__ attribute that is needed for heap operations".format(elem))
+
     def insert(self, elem):
         """
         Insert an element into the heap. The element has to have an attribute called `__key__`  which provides the key
@@ -65,9 +76,7 @@ class Heap (ABC):
         :param elem: The element to insert into the heap
         :return
         """
-        if not hasattr(elem, "__key__"):
-            raise TypeError("{} does not define the __key__ attribute that is needed for heap operations")
-
+        Heap._check_key(elem)
         self.store.append(elem)
         self._heapify(len(self.store) - 1)
 
@@ -92,11 +101,11 @@ class Heap (ABC):
 
     def build_heap(self):
         """
-        This re-builds the full heap. This is necessary if sometime there are many key updates for the heap elements
-        externally and it is necessary to rebuild the whole heap.
+        This re-builds the full heap in `O(n)`. This is necessary if sometime there are many key updates for the heap
+        elements externally and it is necessary to rebuild the whole heap.
         """
         for i in range(len(self) // 2, -1, -1):
-            self._heapify(i)
+            self._sift_down(i)
 
 
 class MinHeap (Heap):
@@ -109,8 +118,10 @@ class MinHeap (Heap):
     @staticmethod
     def from_iterable(collection):
         heap = MinHeap()
-        for elem in collection:
-            heap.insert(elem)
+        heap.store = list(collection)
+        for elem in heap.store:
+            Heap._check_key(elem)
+        heap.build_heap()
         return heap
 
 
@@ -124,6 +135,316 @@ class MaxHeap (Heap):
     @staticmethod
     def from_iterable(collection):
         heap = MaxHeap()
-        for elem in collection:
-            heap.insert(elem)
-        return heap
\ No newline at end of file
+        heap.store = list(collection)
+        for elem in heap.store:
+            Heap._check_key(elem)
+        heap.build_heap()
+        return heap
+
+
+class IndexedHeap (ABC):
+    """
+    An addressable heap. Unlike `Heap`, the keys are stored alongside the items, and a position map from each item to
+    its index in the heap is maintained. The item itself acts as the handle, so it has to be hashable and unique
+    within the heap. This allows changing the key of, or removing, an arbitrary item in `O(log(n))`.
+    """
+    def __init__(self):
+        self.store = list()
+        self.positions = dict()
+
+    def __len__(self):
+        return len(self.store)
+
+    def __iter__(self):
+        return iter(map(lambda entry: entry[1], self.store))
+
+    def __contains__(self, item) -> bool:
+        return item in self.positions
+
+    def __getitem__(self, item):
+        """
+        Returns the current key of an item in the heap.
+        :param item: The handle of the item
+        :return: The key
+        """
+        return self.store[self.positions[item]][0]
+
+    @abstractmethod
+    def _compare(self, left, right) -> bool:
+        pass
+
+    def _swap(self, left: int, right: int):
+        store = self.store
+        store[left], store[right] = store[right], store[left]
+        self.positions[store[left][1]] = left
+        self.positions[store[right][1]] = right
+
+    def _bubble_up(self, idx: int) -> int:
+        store = self.store
+        while idx > 0:
+            parent = (idx - 1) // 2
+            if self._compare(store[idx][0], store[parent][0]):
+                break
+            self._swap(idx, parent)
+            idx = parent
+        return idx
+
+    def _bubble_down(self, idx: int):
+        store = self.store
+        size = len(store)
+        while True:
+            child = idx * 2 + 1
+            if child >= size:
+                break
+            right = child + 1
+            if right < size and self._compare(store[child][0], store[right][0]):
+                child = right
+            if self._compare(store[child][0], store[idx][0]):
+                break
+            self._swap(idx, child)
+            idx = child
+
+    def _sift(self, idx: int):
+        self._bubble_down(self._bubble_up(idx))
+
+    def insert(self, item, key):
+        """
+        Insert an item into the heap.
+        :param item: The handle. Has to be hashable and not already present in the heap
+        :param key: The key used for ordering
+        :return:
+        """
+        if item in self.positions:
+            raise ValueError("{} is already in the heap".format(item))
+        self.store.append([key, item])
+        self.positions[item] = len(self.store) - 1
+        self._bubble_up(len(self.store) - 1)
+
+    def extract_extreme(self):
+        """
+        Extract the top of the heap
+        :return: A tuple (item, key), or None if the heap is empty
+        """
+        if len(self.store) == 0:
+            return None
+        self._swap(0, len(self.store) - 1)
+        key, item = self.store.pop()
+        del self.positions[item]
+        if len(self.store) > 0:
+            self._bubble_down(0)
+        return item, key
+
+    def get_extreme(self):
+        """
+        Returns the top of the heap without extracting it
+        :return: A tuple (item, key)
+        """
+        key, item = self.store[0]
+        return item, key
+
+    def update(self, item, key):
+        """
+        Change the key of an item already in the heap. The key can move in either direction.
+        :param item: The handle of the item
+        :param key: The new key
+        :return:
+        """
+        idx = self.positions[item]
+        self.store[idx][0] = key
+        self._sift(idx)
+
+    def remove(self, item):
+        """
+        Remove an arbitrary item from the heap.
+        :param item: The handle of the item
+        :return: The key the item had
+        """
+        idx = self.positions[item]
+        self._swap(idx, len(self.store) - 1)
+        key, _ = self.store.pop()
+        del self.positions[item]
+        if idx < len(self.store):
+            self._sift(idx)
+        return key
+
+
+class IndexedMinHeap (IndexedHeap):
+    """
+    Implements an addressable min-heap, where the item with the smallest key is always at the top of the heap.
+    """
+    def _compare(self, left, right) -> bool:
+        return left >= right
+
+    def decrease_key(self, item, key):
+        """
+        Decrease the key of an item already in the heap.
+        :param item: The handle of the item
+        :param key: The new key. Must not be larger than the current key
+        :return:
+        """
+        if key > self[item]:
+            raise ValueError("New key {} is larger than the current key {}".format(key, self[item]))
+        idx = self.positions[item]
+        self.store[idx][0] = key
+        self._bubble_up(idx)
+
+
+class IndexedMaxHeap (IndexedHeap):
+    """
+    Implements an addressable max-heap, where the item with the largest key is always at the top of the heap.
+    """
+    def _compare(self, left, right) -> bool:
+        return left <= right
+
+    def increase_key(self, item, key):
+        """
+        Increase the key of an item already in the heap.
+        :param item: The handle of the item
+        :param key: The new key. Must not be smaller than the current key
+        :return:
+        """
+        if key < self[item]:
+            raise ValueError("New key {} is smaller than the current key {}".format(key, self[item]))
+        idx = self.positions[item]
+        self.store[idx][0] = key
+        self._bubble_up(idx)
+
+
+class ReverseKey:
+    """
+    Wraps a key so that it compares in the opposite order. This turns the min-heaps of `heapq` into max-heaps for any
+    kind of key, not just numbers that could be negated.
+    """
+    __slots__ = ["key"]
+
+    def __init__(self, key):
+        self.key = key
+
+    def __lt__(self, other: 'ReverseKey') -> bool:
+        return other.key < self.key
+
+    def __eq__(self, other) -> bool:
+        return type(other) == ReverseKey and self.key == other.key
+
+
+def _get_key(elem):
+    return elem.__key__()
+
+
+class KeyedHeap (ABC):
+    """
+    A heap that asks for the key of an element once, when it is inserted, and stores `(key, sequence number, element)`
+    tuples in a list maintained by `heapq`. Comparisons then happen in C, on the keys directly, and the sequence number
+    breaks ties so the elements themselves are never compared. Elements with equal keys come out in insertion order.
+
+    It has the same interface as `MinHeap` and `MaxHeap`. By default the key is taken from the `__key__` method, but
+    any function can be passed instead. Since keys are not re-read on every comparison, call `build_heap` after
+    changing them.
+    """
+    def __init__(self, key: Callable[[Any], Any] = None):
+        self.store = list()
+        self.key = _get_key if key is None else key
+        self.seq = 0
+
+    def __len__(self):
+        return len(self.store)
+
+    def __iter__(self):
+        return iter(map(lambda entry: entry[2], self.store))
+
+    @abstractmethod
+    def _wrap(self, key):
+        pass
+
+    def _entry(self, elem) -> tuple:
+        self.seq += 1
+        return self._wrap(self.key(elem)), self.seq, elem
+
+    def insert(self, elem):
+        """
+        Insert an element into the heap.
+        :param elem: The element to insert into the heap
+        :return
+        """
+        heapq.heappush(self.store, self._entry(elem))
+
+    def push_many(self, elems: Iterable):
+        """
+        Insert many elements at once. If they are many compared to the size of the heap, the heap is rebuilt in
+        `O(n)` instead of pushing them one by one.
+        :param elems: An iterable of elements
+        :return
+        """
+        entries = list(map(self._entry, elems))
+        if len(entries) > len(self.store):
+            self.store.extend(entries)
+            heapq.heapify(self.store)
+        else:
+            for entry in entries:
+                heapq.heappush(self.store, entry)
+
+    def extract_extreme(self):
+        """
+        Extract the top of the heap
+        """
+        if len(self.store) == 0:
+            return None
+        return heapq.heappop(self.store)[2]
+
+    def pop_many(self, k: int) -> list:
+        """
+        Extract the top `k` elements of the heap, in order.
+        :param k: The number of elements to extract
+        :return: A list of at most `k` elements
+        """
+        store = self.store
+        return [heapq.heappop(store)[2] for _ in range(min(k, len(store)))]
+
+    def get_extreme(self):
+        """
+        Returns the top element in the heap without extracting it
+        """
+        return self.store[0][2]
+
+    def top(self, k: int) -> list:
+        """
+        Returns the top `k` elements in order, without extracting them. This is `O(n log(k))`.
+        :param k: The number of elements
+        :return: A list of at most `k` elements
+        """
+        return list(map(lambda entry: entry[2], heapq.nsmallest(k, self.store)))
+
+    def build_heap(self):
+        """
+        Re-reads the keys of all the elements and re-builds the heap in `O(n)`.
+        """
+        self.store = list(map(lambda entry: (self._wrap(self.key(entry[2])), entry[1], entry[2]), self.store))
+        heapq.heapify(self.store)
+
+
+class KeyedMinHeap (KeyedHeap):
+    """
+    A `KeyedHeap` where the element with the smallest key is always at the top of the heap.
+    """
+    def _wrap(self, key):
+        return key
+
+    @staticmethod
+    def from_iterable(collection, key: Callable[[Any], Any] = None):
+        heap = KeyedMinHeap(key)
+        heap.push_many(collection)
+        return heap
+
+
+class KeyedMaxHeap (KeyedHeap):
+    """
+    A `KeyedHeap` where the element with the largest key is always at the top of the heap.
+    """
+    def _wrap(self, key):
+        return ReverseKey(key)
+
+    @staticmethod
+    def from_iterable(collection, key: Callable[[Any], Any] = None):
+        heap = KeyedMaxHeap(key)
+        heap.push_many(collection)
+        return heap
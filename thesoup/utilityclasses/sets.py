@@ -1,23 +1,35 @@
+from collections import Counter
+from heapq import nlargest
+from itertools import chain, repeat
+
+
 class CountSet:
     """
     This class implements a set where if multiple elements are inserted, the set keeps track of counts.
     It supports the usual set functionality like add, update, etc. Along with that it also supports access with square
     brackets (__getitem__) that returns the count of an element. If absent, 0 is returned
+
+    Bulk inserts (the constructor and `update`) count their whole input in C with `collections.Counter` first, and
+    then fold in one count per distinct item. This makes counting large buffers of repeated values, like `bytes` or an
+    `array.array` of ids, many times faster than adding items one by one.
+
+    It also supports multiset algebra. `+` and `-` add and subtract counts, `&` and `|` take the smaller and larger
+    count of every item, and `<=` / `>=` test for sub / super multisets. `+=` and `-=` update the left hand side in
+    place, and only touch the items of the right hand side, so folding many partial counts into one does not copy it.
     """
     def __init__(self, iterable=None):
         self.num = 0
         self.store = dict()
         if iterable is not None:
-            for elem in iterable:
-                self.add(elem)
+            self.update(iterable)
 
-    def _add_many(self, items: list):
+    def _add_many(self, items):
+        store = self.store
+        num = 0
         for item, count in items:
-            if item in self.store:
-                self.store[item] += count
-            else:
-                self.store[item] = count
-            self.num += count
+            store[item] = store.get(item, 0) + count
+            num += count
+        self.num += num
 
     def add(self, item):
         """
@@ -34,13 +46,14 @@ class CountSet:
 
     def update(self, items):
         """
-        Method to add many items to the set.
+        Method to add many items to the set. Any iterable works. Iterating `bytes`, `bytearray` or an `array.array`
+        gives ints, so those are counted as ints, and a dict adds each of its keys once.
 
         :param items: The iterable of items to add
         :return: Void
         """
-        for item in items:
-            self.add(item)
+        # iter() so that Counter does not read a mapping as item to count pairs
+        self._add_many(Counter(iter(items)).items())
 
     def __contains__(self, item) -> bool:
         return item in self.store
@@ -48,15 +61,120 @@ class CountSet:
     def __getitem__(self, item) -> int:
         return 0 if item not in self.store else self.store[item]
 
-    def __add__(self, other: 'CountSet') -> 'CountSet':
+    @staticmethod
+    def _check_type(other, operation: str):
         if type(other) != CountSet:
-            raise TypeError(f"Cannot add {type(other)} with CountSet object")
+            raise TypeError(f"Cannot {operation} {type(other)} with CountSet object")
+
+    @staticmethod
+    def _from_store(store: dict) -> 'CountSet':
+        counts = CountSet()
+        counts.store = store
+        counts.num = sum(store.values())
+        return counts
+
+    def __add__(self, other: 'CountSet') -> 'CountSet':
+        CountSet._check_type(other, "add")
         added = CountSet()
         added.store = self.store.copy()
         added.num = self.num
         added._add_many(other.store.items())
         return added
 
+    def __iadd__(self, other: 'CountSet') -> 'CountSet':
+        CountSet._check_type(other, "add")
+        self._add_many(other.store.items())
+        return self
+
+    def __isub__(self, other: 'CountSet') -> 'CountSet':
+        CountSet._check_type(other, "subtract")
+        store = self.store
+        for item, count in list(other.store.items()) if other is self else other.store.items():
+            current = store.get(item, 0)
+            if current > count:
+                store[item] = current - count
+                self.num -= count
+            elif current > 0:
+                del store[item]
+                self.num -= current
+        return self
+
+    def __sub__(self, other: 'CountSet') -> 'CountSet':
+        """
+        Returns the counts of this set minus the counts of another. Items whose count drops to 0 or below are removed.
+        """
+        CountSet._check_type(other, "subtract")
+        subtracted = CountSet()
+        subtracted.store = self.store.copy()
+        subtracted.num = self.num
+        subtracted -= other
+        return subtracted
+
+    def __and__(self, other: 'CountSet') -> 'CountSet':
+        """
+        Returns the intersection, with the smaller of the 2 counts of every item.
+        """
+        CountSet._check_type(other, "intersect")
+        smaller, larger = (self.store, other.store) if len(self.store) <= len(other.store) else (other.store, self.store)
+        return CountSet._from_store(dict(
+            [(item, min(count, larger[item])) for item, count in smaller.items() if item in larger]
+        ))
+
+    def __or__(self, other: 'CountSet') -> 'CountSet':
+        """
+        Returns the union, with the larger of the 2 counts of every item.
+        """
+        CountSet._check_type(other, "union")
+        store = self.store.copy()
+        for item, count in other.store.items():
+            if count > store.get(item, 0):
+                store[item] = count
+        return CountSet._from_store(store)
+
+    def issubset(self, other: 'CountSet') -> bool:
+        """
+        Tells if every item of this set is in another one, at least as many times.
+        :param other: The other set
+        :return: Boolean
+        """
+        CountSet._check_type(other, "compare")
+        if self.num > other.num or len(self.store) > len(other.store):
+            return False
+        return all(count <= other.store.get(item, 0) for item, count in self.store.items())
+
+    def issuperset(self, other: 'CountSet') -> bool:
+        """
+        Tells if every item of another set is in this one, at least as many times.
+        :param other: The other set
+        :return: Boolean
+        """
+        CountSet._check_type(other, "compare")
+        return other.issubset(self)
+
+    def __le__(self, other: 'CountSet') -> bool:
+        return self.issubset(other)
+
+    def __ge__(self, other: 'CountSet') -> bool:
+        return self.issuperset(other)
+
+    def most_common(self, k: int = None) -> list:
+        """
+        Returns the items with the highest counts. With `k`, it keeps a heap of k items instead of sorting all of them.
+        Items with equal counts come out in the order they were first added.
+        :param k: The number of items to return. All of them if not passed
+        :return: A list of (item, count) tuples, highest count first
+        """
+        if k is None:
+            return sorted(self.store.items(), key=lambda elem: elem[1], reverse=True)
+        return nlargest(k, self.store.items(), key=lambda elem: elem[1])
+
+    def elements(self):
+        """
+        Lazily iterates over the items, each repeated as many times as its count.
+        :return: An iterator
+        """
+        return chain.from_iterable(map(lambda elem: repeat(elem[0], elem[1]), self.store.items()))
+
     def __iter__(self):
         return iter(self.store.items())
 
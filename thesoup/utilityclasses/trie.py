@@ -1,3 +1,16 @@
+import codecs
+import gc
+import struct
+from array import array
+from bisect import bisect_left
+from heapq import heappop, heappush
+from itertools import islice
+
+from thesoup.utilityclasses._mappedfile import MappedFile, write_mapped_file
+
+_NO_SCORE = float("-inf")
+
+
 class TrieNode:
     """
     This class implements a node in a trie. It's usage outside of a trie is not recommended although no one is
@@ -6,16 +19,25 @@ class TrieNode:
     NOTE: This supports ASCII character set only.
 
     Structurally, it contains a fixed size list internally, initialized to all Nones. Whenever a character in inserted,
-    it creates another TrieNode object at the index corresponding to the ascii character.
+    it creates another TrieNode object at the index corresponding to the ascii character. The list is only allocated
+    when the first character is inserted, so leaves, which are most of the nodes of a trie, do not pay for it.
+
+    A node also carries the `score` of the word that ends at it, and `best`, the highest score of any word in its
+    subtree. The trie uses `best` to find the highest scoring completions without visiting the whole subtree.
     """
+    __slots__ = ["storage", "end_marker", "score", "best"]
+
     ASCII_CHARSET_SIZE = 128
+    _NO_CHILDREN = (None,) * ASCII_CHARSET_SIZE
 
     def __init__(self):
         """
         Constructor. Needs no parameters
         """
-        self.storage = [None] * TrieNode.ASCII_CHARSET_SIZE
+        self.storage = None
         self.end_marker = False
+        self.score = 0
+        self.best = _NO_SCORE
 
     def __contains__(self, char: str) -> bool:
         """
@@ -25,7 +47,7 @@ class TrieNode:
         """
         if len(char) > 1:
             raise ValueError("'{}' is not a single character.".format(char))
-        return self.storage[ord(char)] is not None
+        return self.storage is not None and self.storage[ord(char)] is not None
 
     def __getitem__(self, char: str) -> 'TrieNode':
         """
@@ -36,14 +58,104 @@ class TrieNode:
         """
         if len(char) > 1:
             raise ValueError("'{}' is not a single character.".format(char))
-        return self.storage[ord(char)]
+        return None if self.storage is None else self.storage[ord(char)]
 
     def __iter__(self):
         """
         Implements the iter functionality. It iterates over the internal storage.
         :return: An iterator.
         """
-        return iter(self.storage)
+        return iter(TrieNode._NO_CHILDREN if self.storage is None else self.storage)
+
+    def items(self):
+        """
+        Iterates over the characters present in the node and their child nodes, in character order.
+        :return: An iterator of (character, TrieNode) tuples
+        """
+        if self.storage is None:
+            return iter(())
+        return map(lambda elem: (chr(elem[0]), elem[1]), filter(lambda elem: elem[1] is not None, enumerate(self.storage)))
+
+    def set_char(self, char: str, end_marker: bool = False):
+        """
+        This sets a character inside a trie. If the character already existed at that position, a end marker is installed
+        if needed.
+        :param char:
+        :param end_marker:
+        :return:
+        """
+        if len(char) > 1:
+            raise ValueError("'{}' is not a single character.".format(char))
+
+        node = self.add_child(char)
+        node.end_marker = end_marker or node.end_marker
+
+    def add_child(self, char: str) -> 'TrieNode':
+        """
+        Returns the child node for a character, creating it if it is absent. Unlike `set_char`, it does not check that
+        `char` is a single character.
+        :param char:
+        :return: The child node
+        """
+        storage = self.storage
+        if storage is None:
+            storage = self.storage = [None] * TrieNode.ASCII_CHARSET_SIZE
+        child = storage[ord(char)]
+        if child is None:
+            child = storage[ord(char)] = type(self)()
+        return child
+
+
+class SparseTrieNode:
+    """
+    A trie node that supports the full Unicode character set. Instead of a list with a slot for every possible
+    character, it keeps a dict of only the characters that are present, which is allocated when the first one is
+    inserted. It has the same interface as `TrieNode`.
+    """
+    __slots__ = ["children", "end_marker", "score", "best"]
+
+    def __init__(self):
+        """
+        Constructor. Needs no parameters
+        """
+        self.children = None
+        self.end_marker = False
+        self.score = 0
+        self.best = _NO_SCORE
+
+    def __contains__(self, char: str) -> bool:
+        """
+        Implements the contains functionality. You can do `'a' in trie_node_object`.
+        :param char: The character to test
+        :return: Boolean
+        """
+        if len(char) > 1:
+            raise ValueError("'{}' is not a single character.".format(char))
+        return self.children is not None and char in self.children
+
+    def __getitem__(self, char: str) -> 'SparseTrieNode':
+        """
+        Returns the child node for a character, or `None` if the character is absent.
+        :param char:
+        :return:
+        """
+        if len(char) > 1:
+            raise ValueError("'{}' is not a single character.".format(char))
+        return None if self.children is None else self.children.get(char)
+
+    def __iter__(self):
+        """
+        Iterates over the child nodes, in character order.
+        :return: An iterator.
+        """
+        return map(lambda elem: elem[1], self.items())
+
+    def items(self):
+        """
+        Iterates over the characters present in the node and their child nodes, in character order.
+        :return: An iterator of (character, SparseTrieNode) tuples
+        """
+        return iter(()) if self.children is None else iter(sorted(self.children.items()))
 
     def set_char(self, char: str, end_marker: bool = False):
         """
@@ -56,53 +168,327 @@ class TrieNode:
         if len(char) > 1:
             raise ValueError("'{}' is not a single character.".format(char))
 
-        if char not in self:
-            self.storage[ord(char)] = TrieNode()
-        node = self.storage[ord(char)]
+        node = self.add_child(char)
         node.end_marker = end_marker or node.end_marker
 
+    def add_child(self, char: str) -> 'SparseTrieNode':
+        """
+        Returns the child node for a character, creating it if it is absent. Unlike `set_char`, it does not check that
+        `char` is a single character.
+        :param char:
+        :return: The child node
+        """
+        children = self.children
+        if children is None:
+            children = self.children = dict()
+        child = children.get(char)
+        if child is None:
+            child = children[char] = type(self)()
+        return child
+
 
 class Trie:
     """
     This class is the implement of a Trie data structure, for the ASCII character set. The contents are case sensitive.
     """
+    node_type = TrieNode
 
     def __init__(self):
         """
         Constructor. This takes no arguments
         """
-        self.root = TrieNode()
+        self.root = self.node_type()
+
+    def _find(self, word: str) -> TrieNode:
+        node = self.root
+        for char in word:
+            node = node[char]
+            if node is None:
+                return None
+        return node
 
     @staticmethod
-    def _insert_callback(word: str, start_pos: int, node: TrieNode):
-        if start_pos == len(word) - 1:
-            node.set_char(word[start_pos], True)
-        else:
-            node.set_char(word[start_pos])
-            Trie._insert_callback(word, start_pos + 1, node[word[start_pos]])
+    def _end_word(path: list, score):
+        # Marks the end of a word at the last node of the path from the root, and raises the best score of the nodes
+        # on the path. A node's best is never below its children's, so it can stop at the first one that is high enough.
+        node = path[-1]
+        node.end_marker = True
+        node.score = node.score + 1 if score is None else score
+        score = node.score
+        for node in reversed(path):
+            if node.best >= score:
+                break
+            node.best = score
 
     @staticmethod
-    def _search_callback(word: str, pos: int, node: TrieNode) -> bool:
-        if pos == len(word):
-            return node
-        else:
-            return Trie._search_callback(word, pos + 1, node[word[pos]]) if (word[pos] in node) else None
+    def _iter_lexicographic(prefix: str, node: TrieNode):
+        stack = [(prefix, node)]
+        while stack:
+            word, node = stack.pop()
+            if node.end_marker:
+                yield word
+            stack.extend([(word + char, child) for char, child in node.items()][::-1])
 
     @staticmethod
-    def _collect_branches(node: TrieNode) -> list:
+    def _iter_by_score(prefix: str, node: TrieNode):
+        # Entries are (-score, word, is_subtree, node). A subtree is pushed with its best score, which bounds the
+        # score of every word in it, so a word is only popped once nothing left in the heap can beat it.
+        heap = [(-node.best, prefix, True, node)]
+        while heap:
+            neg_score, word, is_subtree, node = heappop(heap)
+            if not is_subtree:
+                yield word
+                continue
+            if node.end_marker:
+                heappush(heap, (-node.score, word, False, None))
+            for char, child in node.items():
+                heappush(heap, (-child.best, word + char, True, child))
+
+    def insert(self, word: str, score=None):
+        """
+        This function inserts a word into the trie
+        :param word: The word to insert into the trie
+        :param score: The score to rank the word by in `iter_prefix`. If not passed, the score counts the number of
+                      times the word was inserted.
+        :return
+        """
+        path = [self.root]
+        for char in word:
+            path.append(path[-1].add_child(char))
+        Trie._end_word(path, score)
+
+    def insert_many(self, words, pause_gc: bool = False):
+        """
+        Inserts a sequence of words, counting each occurrence as in `insert`. Consecutive words share the nodes of
+        their common prefix instead of walking down from the root again, so sorted input loads fastest.
+        :param words: An iterable of words
+        :param pause_gc: If True, the garbage collector is disabled while loading. Nodes never form reference cycles,
+                         and for millions of words most of the load time otherwise goes to the collector rescanning
+                         every node created so far. This affects the whole process, including other threads.
+        :return:
+        """
+        gc_enabled = gc.isenabled()
+        if pause_gc:
+            gc.disable()
+        try:
+            path = [self.root]
+            previous = ""
+            for word in words:
+                common = 0
+                limit = min(len(word), len(previous))
+                while common < limit and word[common] == previous[common]:
+                    common += 1
+                del path[common + 1:]
+                for char in word[common:]:
+                    path.append(path[-1].add_child(char))
+                Trie._end_word(path, None)
+                previous = word
+        finally:
+            if pause_gc and gc_enabled:
+                gc.enable()
+
+    @classmethod
+    def from_iterable(cls, words, pause_gc: bool = False) -> 'Trie':
+        """
+        Builds a trie out of a sequence of words. See `insert_many`.
+        :param words: An iterable of words
+        :param pause_gc: If True, the garbage collector is disabled while loading
+        :return: The trie
+        """
+        trie = cls()
+        trie.insert_many(words, pause_gc)
+        return trie
+
+    def __contains__(self, word: str) -> bool:
+        """
+        This implements the contains method. Use it like "word" in my_trie_struct
+        :param word:
+        :return: `boolean` whether the trie contains the word
+        """
+        terminal_node = self._find(word)
+        return False if terminal_node is None else terminal_node.end_marker
+
+    def iter_prefix(self, prefix: str, limit: int = None, by_score: bool = False):
+        """
+        Lazily yields the words that start with a prefix, in lexicographic order. This is useful for implementing
+        type-ahead, where only the first few completions are needed.
+        :param prefix: The prefix
+        :param limit: The maximum number of words to yield. All of them if not passed
+        :param by_score: If True, the words are yielded highest score first (ties in lexicographic order), and only
+                         the parts of the trie that can hold one of the next best words are visited.
+        :return: A generator of words
+        """
+        node = self._find(prefix)
         if node is None:
-            return ['']
-        sub_strings = []
-        valid_next_nodes = filter(lambda elem: elem[1] is not None, enumerate(node))
-        for enum, nxt in valid_next_nodes:
-            char = chr(enum)
-            end_marker = nxt.end_marker
-            if end_marker:
-                sub_strings.append(char)
-
-            more_substrings = ["{}{}".format(char, s) for s in Trie._collect_branches(nxt)]
-            sub_strings.extend(more_substrings)
-        return sub_strings
+            return
+        words = Trie._iter_by_score(prefix, node) if by_score else Trie._iter_lexicographic(prefix, node)
+        yield from islice(words, limit)
+
+    def score(self, word: str):
+        """
+        Returns the score of a word.
+        :param word: The word
+        :return: The score, or None if the word is not in the trie
+        """
+        terminal_node = self._find(word)
+        return terminal_node.score if terminal_node is not None and terminal_node.end_marker else None
+
+    def freeze(self) -> 'FrozenTrie':
+        """
+        Returns an immutable, compact copy of the trie. See `FrozenTrie`.
+        :return: The frozen trie
+        """
+        return FrozenTrie.from_iterable(self.iter_prefix(""))
+
+    def __getitem__(self, word: str) -> list:
+        """
+        This returns the words under the passed index, in lexicographic order. This is useful for implementing
+        type-ahead.
+        :param word: The index
+        :return: A list of words under the index. It is empty if no word starts with the index
+        """
+        return list(self.iter_prefix(word))
+
+
+class SparseTrie (Trie):
+    """
+    A Trie for the full Unicode character set, built out of `SparseTrieNode`s. Nodes only store the characters that
+    follow them, so it also takes a fraction of the memory of `Trie` for ASCII words.
+    """
+    node_type = SparseTrieNode
+
+
+class AhoCorasick:
+    """
+    An Aho-Corasick automaton, for finding every occurrence of a set of keywords in a text in a single pass, however
+    many keywords there are.
+
+    The states of the automaton are the nodes of a trie of the keywords. Each state also has a failure link, to the
+    state for the longest proper suffix of its text that is in the trie, and an output link, to the nearest state along
+    the failure links at which a keyword ends. When the next character of the text has no edge out of the current
+    state, the automaton follows failure links until one does. Every keyword that ends at a position is found by
+    following output links from the current state.
+    """
+
+    def __init__(self, trie: Trie):
+        """
+        Constructor. The automaton copies what it needs, so the trie can be changed afterwards.
+        :param trie: A trie with the keywords. Any `Trie`, such as a `SparseTrie`
+        """
+        # State 0 is the root. goto[s] maps a character to the next state, keywords[s] is the keyword that ends at s.
+        self.goto = [dict()]
+        self.keywords = [None]
+
+        queue = [(trie.root, 0, "")]
+        for node, state, word in queue:
+            for char, child in node.items():
+                child_state = len(self.goto)
+                self.goto[state][char] = child_state
+                self.goto.append(dict())
+                self.keywords.append(word + char if child.end_marker else None)
+                queue.append((child, child_state, word + char))
+
+        # The states were numbered breadth first, so a state's failure link always points to an earlier state.
+        self.fail = [0] * len(self.goto)
+        self.output = [0] * len(self.goto)
+        for state, edges in enumerate(self.goto):
+            for char, child_state in edges.items():
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                fallback = self.goto[fallback].get(char, 0) if state else 0
+                self.fail[child_state] = fallback
+                self.output[child_state] = fallback if self.keywords[fallback] is not None else self.output[fallback]
+
+    @classmethod
+    def from_iterable(cls, keywords) -> 'AhoCorasick':
+        """
+        Builds an automaton for a sequence of keywords, of any Unicode characters.
+        :param keywords: An iterable of keywords
+        :return: The automaton
+        """
+        return cls(SparseTrie.from_iterable(keywords))
+
+    def __len__(self):
+        return len(self.goto)
+
+    def _scan(self, text: str, state: int, offset: int):
+        goto = self.goto
+        fail = self.fail
+        output = self.output
+        keywords = self.keywords
+        for pos, char in enumerate(text, offset + 1):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            match = state if keywords[state] is not None else output[state]
+            while match:
+                yield pos - len(keywords[match]), keywords[match]
+                match = output[match]
+        return state
+
+    def scan(self, text: str):
+        """
+        Finds every occurrence of the keywords in a text, including ones that overlap. The matches are yielded in the
+        order in which they end, and for the same end, longest first.
+        :param text: The text
+        :return: A generator of (position, keyword) tuples, where position is the index the keyword starts at
+        """
+        yield from self._scan(text, 0, 0)
+
+    def scan_stream(self, chunks, encoding: str = "utf-8"):
+        """
+        Finds every occurrence of the keywords in a text that comes in chunks, like the lines or blocks read from a
+        file. Matches that span 2 chunks are found too, and only one chunk is held at a time.
+        :param chunks: An iterable of str, or of bytes, which are decoded incrementally so a character can be split
+                       across chunks
+        :param encoding: The encoding of bytes chunks
+        :return: A generator of (position, keyword) tuples, where position is the character offset in the whole
+                 stream the keyword starts at
+        """
+        decoder = codecs.getincrementaldecoder(encoding)()
+        state = 0
+        offset = 0
+        for chunk in chunks:
+            if type(chunk) != str:
+                chunk = decoder.decode(chunk)
+            state = yield from self._scan(chunk, state, offset)
+            offset += len(chunk)
+        yield from self._scan(decoder.decode(b"", True), state, offset)
+
+
+class _RadixTrieNode:
+    """
+    A node of a `RadixTrie`. `label` is the text on the edge from the parent to this node.
+    """
+    __slots__ = ["label", "children", "end_marker"]
+
+    def __init__(self, label: str, end_marker: bool = False):
+        self.label = label
+        self.children = None
+        self.end_marker = end_marker
+
+    def add_child(self, child: '_RadixTrieNode'):
+        if self.children is None:
+            self.children = dict()
+        self.children[child.label[0]] = child
+
+    def get_child(self, char: str) -> '_RadixTrieNode':
+        return None if self.children is None else self.children.get(char)
+
+
+class RadixTrie:
+    """
+    A compressed trie (also called a radix tree or Patricia trie). A chain of nodes with a single child each is merged
+    into one edge labelled with the whole substring, so the trie holds one node per branching point instead of one per
+    character. It supports the full Unicode character set.
+    """
+
+    def __init__(self):
+        """
+        Constructor. This takes no arguments
+        """
+        self.root = _RadixTrieNode("")
 
     def insert(self, word: str):
         """
@@ -110,7 +496,41 @@ class Trie:
         :param word: The word to insert into the trie
         :return
         """
-        Trie._insert_callback(word, 0, self.root)
+        node = self.root
+        pos = 0
+        while pos < len(word):
+            child = node.get_child(word[pos])
+            if child is None:
+                node.add_child(_RadixTrieNode(word[pos:], True))
+                return
+            common = _common_prefix_length(child.label, word, 0, pos)
+            if common < len(child.label):
+                middle = _RadixTrieNode(child.label[:common])
+                child.label = child.label[common:]
+                middle.add_child(child)
+                node.add_child(middle)
+                child = middle
+            node = child
+            pos += common
+        node.end_marker = True
+
+    def _find(self, prefix: str):
+        # Returns the node under which all the words with the prefix are, and the text up to that node. The prefix
+        # can end half way along the edge into the node.
+        node = self.root
+        pos = 0
+        while pos < len(prefix):
+            child = node.get_child(prefix[pos])
+            if child is None:
+                return None, None
+            common = _common_prefix_length(child.label, prefix, 0, pos)
+            if common < len(child.label):
+                if pos + common < len(prefix):
+                    return None, None
+                return child, prefix + child.label[common:]
+            node = child
+            pos += common
+        return node, prefix
 
     def __contains__(self, word: str) -> bool:
         """
@@ -118,18 +538,270 @@ class Trie:
         :param word:
         :return: `boolean` whether the trie contains the word
         """
-        terminal_node = Trie._search_callback(word, 0, self.root)
-        return False if terminal_node is None else terminal_node.end_marker
+        node, path = self._find(word)
+        return node is not None and path == word and node.end_marker
+
+    def iter_prefix(self, prefix: str, limit: int = None):
+        """
+        Lazily yields the words that start with a prefix, in lexicographic order.
+        :param prefix: The prefix
+        :param limit: The maximum number of words to yield. All of them if not passed
+        :return: A generator of words
+        """
+        node, path = self._find(prefix)
+        if node is None:
+            return
+        yield from islice(RadixTrie._iter_lexicographic(path, node), limit)
+
+    @staticmethod
+    def _iter_lexicographic(path: str, node: _RadixTrieNode):
+        stack = [(path, node)]
+        while stack:
+            word, node = stack.pop()
+            if node.end_marker:
+                yield word
+            if node.children is not None:
+                stack.extend([(word + child.label, child) for _, child in sorted(node.children.items(), reverse=True)])
+
+    def freeze(self) -> 'FrozenTrie':
+        """
+        Returns an immutable, compact copy of the trie. See `FrozenTrie`.
+        :return: The frozen trie
+        """
+        return FrozenTrie.from_iterable(self.iter_prefix(""))
+
+    def __getitem__(self, word: str) -> list:
+        """
+        This returns the words under the passed index, in lexicographic order.
+        :param word: The index
+        :return: A list of words under the index. It is empty if no word starts with the index
+        """
+        return list(self.iter_prefix(word))
+
+
+class FrozenTrie:
+    """
+    An immutable trie, for dictionaries that do not change once they are loaded. It is a compressed trie over the
+    UTF-8 bytes of the words, in which identical subtrees are stored only once (a DAWG), so common suffixes like "ing"
+    or "tion" are shared between words.
+
+    Nodes are numbered, and the whole structure lives in a handful of flat arrays, laid out like a CSR graph: the edges
+    out of node `i` are at positions `offsets[i]` to `offsets[i + 1]`, sorted by the first byte of their label, which
+    is in `first_bytes`. The label of an edge is `labels[label_starts[e]:label_starts[e] + label_lengths[e]]` and it
+    leads to node `targets[e]`. `finals[i]` is 1 if a word ends at node `i`.
+
+    It can be written to a file and memory-mapped back, in which case the arrays are views into the mapping and only
+    the pages that are touched are read from disk.
+    """
+
+    def __init__(self, root: int, offsets, finals, first_bytes, label_starts, label_lengths, targets, labels,
+                 num_words: int):
+        self.root = root
+        self.offsets = offsets
+        self.finals = finals
+        self.first_bytes = first_bytes
+        self.label_starts = label_starts
+        self.label_lengths = label_lengths
+        self.targets = targets
+        self.labels = labels
+        self.num_words = num_words
+        self._mapping = None
+
+    @staticmethod
+    def from_iterable(words) -> 'FrozenTrie':
+        """
+        Builds a frozen trie.
+        :param words: An iterable of words. Duplicates are ignored
+        :return: The frozen trie
+        """
+        keys = sorted(set(word.encode("utf-8") for word in words))
+
+        offsets = array("q", [0])
+        finals = bytearray()
+        first_bytes = bytearray()
+        label_starts = array("q")
+        label_lengths = array("q")
+        targets = array("q")
+        labels = bytearray()
+        node_ids = dict()
+        label_ids = dict()
+
+        def _intern(final: bool, edges: list) -> int:
+            signature = (final, tuple(edges))
+            node_id = node_ids.get(signature)
+            if node_id is not None:
+                return node_id
+            node_id = len(finals)
+            node_ids[signature] = node_id
+            finals.append(final)
+            for label, target in edges:
+                if label not in label_ids:
+                    label_ids[label] = len(labels)
+                    labels.extend(label)
+                first_bytes.append(label[0])
+                label_starts.append(label_ids[label])
+                label_lengths.append(len(label))
+                targets.append(target)
+            offsets.append(len(targets))
+            return node_id
+
+        def _open(lo: int, hi: int, depth: int) -> list:
+            # All the keys in [lo, hi) share their first `depth` bytes. Sorted, so the one that ends there is first.
+            final = lo < hi and len(keys[lo]) == depth
+            return [lo + final, hi, depth, final, [], None]
+
+        # Builds the nodes bottom up, with an explicit stack of [lo, hi, depth, final, edges, label of open edge].
+        # A node is interned after all its children, so identical subtrees get the same id.
+        stack = [_open(0, len(keys), 0)]
+        while True:
+            frame = stack[-1]
+            lo, hi, depth = frame[0], frame[1], frame[2]
+            if lo < hi:
+                byte = keys[lo][depth]
+                group_end = lo + 1
+                while group_end < hi and keys[group_end][depth] == byte:
+                    group_end += 1
+                common = _common_prefix_length(keys[lo], keys[group_end - 1], depth + 1, depth + 1)
+                frame[0] = group_end
+                frame[5] = keys[lo][depth:common]
+                stack.append(_open(lo, group_end, common))
+                continue
+            stack.pop()
+            node_id = _intern(frame[3], frame[4])
+            if not stack:
+                break
+            stack[-1][4].append((stack[-1][5], node_id))
+
+        return FrozenTrie(
+            node_id, offsets, bytes(finals), bytes(first_bytes), label_starts, label_lengths, targets, bytes(labels),
+            len(keys)
+        )
+
+    def num_nodes(self) -> int:
+        return len(self.offsets) - 1
+
+    def num_edges(self) -> int:
+        return len(self.targets)
+
+    def __len__(self):
+        return self.num_words
+
+    def _find(self, key: bytes):
+        # Same as `RadixTrie._find`, over bytes and node ids.
+        node = self.root
+        pos = 0
+        while pos < len(key):
+            end = self.offsets[node + 1]
+            edge = bisect_left(self.first_bytes, key[pos], self.offsets[node], end)
+            if edge == end or self.first_bytes[edge] != key[pos]:
+                return None, None
+            start = self.label_starts[edge]
+            label = bytes(self.labels[start:start + self.label_lengths[edge]])
+            common = _common_prefix_length(label, key, 0, pos)
+            if common < len(label):
+                if pos + common < len(key):
+                    return None, None
+                return self.targets[edge], key + label[common:]
+            node = self.targets[edge]
+            pos += common
+        return node, key
+
+    def __contains__(self, word: str) -> bool:
+        """
+        This implements the contains method. Use it like "word" in my_trie_struct
+        :param word:
+        :return: `boolean` whether the trie contains the word
+        """
+        key = word.encode("utf-8")
+        node, path = self._find(key)
+        return node is not None and path == key and self.finals[node] == 1
+
+    def iter_prefix(self, prefix: str, limit: int = None):
+        """
+        Lazily yields the words that start with a prefix, in lexicographic order.
+        :param prefix: The prefix
+        :param limit: The maximum number of words to yield. All of them if not passed
+        :return: A generator of words
+        """
+        node, path = self._find(prefix.encode("utf-8"))
+        if node is None:
+            return
+        yield from islice(self._iter_lexicographic(path, node), limit)
+
+    def _iter_lexicographic(self, path: bytes, node: int):
+        # UTF-8 preserves the order of code points, so byte order is lexicographic order.
+        stack = [(path, node)]
+        while stack:
+            key, node = stack.pop()
+            if self.finals[node] == 1:
+                yield key.decode("utf-8")
+            for edge in range(self.offsets[node + 1] - 1, self.offsets[node] - 1, -1):
+                start = self.label_starts[edge]
+                stack.append((key + bytes(self.labels[start:start + self.label_lengths[edge]]), self.targets[edge]))
 
     def __getitem__(self, word: str) -> list:
         """
-        This returns the tree under the passed index. This is useful for implementing type-ahead.
+        This returns the words under the passed index, in lexicographic order.
         :param word: The index
-        :return: A list of words under the index
-        """
-        terminal_node = Trie._search_callback(word, 0, self.root)
-        entries = []
-        if terminal_node.end_marker:
-            entries.append(word)
-        entries.extend(["{}{}".format(word, s) for s in Trie._collect_branches(terminal_node)])
-        return entries
+        :return: A list of words under the index. It is empty if no word starts with the index
+        """
+        return list(self.iter_prefix(word))
+
+    def to_file(self, path: str):
+        """
+        Writes the trie to a binary file that `from_file` can memory-map. The layout is a fixed header followed by the
+        arrays, each section aligned to 8 bytes.
+        :param path: The file to write
+        :return:
+        """
+        write_mapped_file(
+            path,
+            _TRIE_FILE_HEADER,
+            _TRIE_FILE_MAGIC,
+            (self.root, self.num_nodes(), self.num_edges(), len(self.labels), self.num_words),
+            [
+                memoryview(self.offsets),
+                memoryview(self.label_starts),
+                memoryview(self.label_lengths),
+                memoryview(self.targets),
+                self.finals,
+                self.first_bytes,
+                self.labels
+            ]
+        )
+
+    @staticmethod
+    def from_file(path: str) -> 'FrozenTrie':
+        """
+        Opens a trie written by `to_file`. The file is memory-mapped read only, so opening is independent of the size
+        of the trie. The mapping lives as long as the returned trie.
+        :param path: The file to open
+        :return: The trie
+        """
+        mapped = MappedFile(path, _TRIE_FILE_HEADER, _TRIE_FILE_MAGIC, "trie")
+        root, n, m, blob_size, num_words = mapped.fields
+
+        offsets = mapped.section(8 * (n + 1), "q")
+        label_starts = mapped.section(8 * m, "q")
+        label_lengths = mapped.section(8 * m, "q")
+        targets = mapped.section(8 * m, "q")
+        finals = mapped.section(n)
+        first_bytes = mapped.section(m)
+        labels = mapped.section(blob_size)
+
+        trie = FrozenTrie(root, offsets, finals, first_bytes, label_starts, label_lengths, targets, labels, num_words)
+        trie._mapping = mapped.mapping
+        return trie
+
+
+_TRIE_FILE_MAGIC = b"SOUPTRI1"
+_TRIE_FILE_HEADER = struct.Struct("<8sB7xqqqqq")
+
+
+def _common_prefix_length(label, word, label_pos: int, word_pos: int) -> int:
+    # The length of the common prefix of label[label_pos:] and word[word_pos:], plus label_pos.
+    limit = min(len(label) - label_pos, len(word) - word_pos)
+    common = 0
+    while common < limit and label[label_pos + common] == word[word_pos + common]:
+        common += 1
+    return label_pos + common
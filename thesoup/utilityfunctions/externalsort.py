@@ -0,0 +1,144 @@
+import os
+import pickle
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, count, islice
+from typing import Callable
+
+from thesoup.utilityfunctions.merge import kway_merge
+
+_BATCH_SIZE = 1024
+
+
+def external_sort(
+        iterable,
+        key: Callable = None,
+        reverse: bool = False,
+        run_size: int = 1000000,
+        fan_in: int = 64,
+        workers: int = None,
+        tmp_dir: str = None):
+    """
+    This function sorts a sequence that does not fit in memory. The input is read in runs of `run_size` elements, and
+    each run is sorted and spilled to a temporary file. The runs are then merged with `kway_merge`, `fan_in` files at a
+    time, and the final merge is streamed back to the caller. If the whole input fits in a single run, it is sorted in
+    memory and nothing is written.
+
+    Like `sorted`, the sort is stable. The elements (and, with `workers`, the key function) must be picklable.
+
+    :param iterable: The elements to sort
+    :param key: A function of one argument that returns the key to sort by. The elements themselves are compared if not
+                passed
+    :param reverse: True to sort in descending order
+    :param run_size: The number of elements sorted in memory at a time. This is the memory budget: at most
+                     `run_size` elements are held at once, or `(workers + 1) * run_size` with `workers`
+    :param fan_in: The number of runs merged at a time. Merging more at once means fewer passes over the data, but
+                   needs an open file and a buffer per run
+    :param workers: If passed, runs are sorted and merged in a pool of this many processes
+    :param tmp_dir: The directory to create the temporary files in. The system default if not passed
+    :return: A generator of the sorted elements
+    """
+    if run_size < 1:
+        raise ValueError("run_size must be at least 1")
+    if fan_in < 2:
+        raise ValueError("fan_in must be at least 2")
+    return _external_sort(iter(iterable), key, reverse, run_size, fan_in, workers, tmp_dir)
+
+
+def _external_sort(
+        iterator,
+        key: Callable,
+        reverse: bool,
+        run_size: int,
+        fan_in: int,
+        workers: int,
+        tmp_dir: str):
+    # The generator behind `external_sort`, which checks the arguments as soon as it is called.
+    first_run = list(islice(iterator, run_size + 1))
+    if len(first_run) <= run_size:
+        first_run.sort(key=key, reverse=reverse)
+        yield from first_run
+        return
+    iterator = chain(first_run, iterator)
+    first_run = None
+
+    pool = None if workers is None else ProcessPoolExecutor(max_workers=workers)
+    in_flight = 1 if pool is None else workers
+    try:
+        with tempfile.TemporaryDirectory(prefix="externalsort", dir=tmp_dir) as directory:
+            paths = (os.path.join(directory, "run{}".format(i)) for i in count())
+            runs = list(_run_tasks(
+                pool,
+                _sort_run,
+                ((run, key, reverse, next(paths)) for run in _chunks(iterator, run_size)),
+                in_flight
+            ))
+            while len(runs) > fan_in:
+                runs = list(_run_tasks(
+                    pool,
+                    _merge_runs,
+                    ((runs[i:i + fan_in], key, reverse, next(paths)) for i in range(0, len(runs), fan_in)),
+                    in_flight
+                ))
+            yield from kway_merge(*[_read_run(path) for path in runs], key=key, reverse=reverse)
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+
+def _chunks(iterator, size: int):
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _run_tasks(pool, function: Callable, tasks, in_flight: int):
+    # Yields function(*task) for every task, in order. With a pool, up to `in_flight` tasks run at once, and the next
+    # task is only taken from the generator when there is room, so chunks are not read ahead of the workers.
+    if pool is None:
+        for task in tasks:
+            yield function(*task)
+        return
+    pending = deque()
+    for task in tasks:
+        pending.append(pool.submit(function, *task))
+        if len(pending) >= in_flight:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def _sort_run(run: list, key: Callable, reverse: bool, path: str) -> str:
+    run.sort(key=key, reverse=reverse)
+    _write_run(run, path)
+    return path
+
+
+def _merge_runs(paths: list, key: Callable, reverse: bool, path: str) -> str:
+    _write_run(kway_merge(*[_read_run(run) for run in paths], key=key, reverse=reverse), path)
+    for run in paths:
+        os.remove(run)
+    return path
+
+
+def _write_run(elements, path: str):
+    # A run file is a sequence of pickled lists of up to `_BATCH_SIZE` elements.
+    with open(path, "wb") as f:
+        elements = iter(elements)
+        batch = list(islice(elements, _BATCH_SIZE))
+        while batch:
+            pickle.dump(batch, f, pickle.HIGHEST_PROTOCOL)
+            batch = list(islice(elements, _BATCH_SIZE))
+
+
+def _read_run(path: str):
+    with open(path, "rb") as f:
+        while True:
+            try:
+                batch = pickle.load(f)
+            except EOFError:
+                return
+            yield from batch
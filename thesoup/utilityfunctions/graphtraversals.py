@@ -1,20 +1,92 @@
+from array import array
 from collections.abc import Sequence
+from heapq import heappop, heappush
 from typing import Any, Callable, Tuple
-from thesoup.utilityclasses.graph import Graph
-from thesoup.utilityclasses.heap import MinHeap
-from thesoup.utilityfunctions.collectionutils import flatten_to_tuple, foreach
+from thesoup.utilityclasses.graph import CSRGraph, Graph
+from thesoup.utilityclasses.heap import IndexedMinHeap
 
 
 def _no_op(_from: Any, _to: Any):
     pass
 
 
-def bfs(graph: Graph, start: Any, bfs_callback: Callable[[Tuple[Any, Any, int]], type(None)]):
+# Tuning constants for switching between top-down and bottom-up steps, from Beamer et al.,
+# "Direction-Optimizing Breadth-First Search"
+_BOTTOM_UP_ALPHA = 14
+_BOTTOM_UP_BETA = 24
+
+
+def _reverse_adjacency(graph: Graph) -> dict:
+    reverse = dict([(v, list()) for v in graph.vertices()])
+    for u in reverse.keys():
+        for v, _ in graph.get_neighbours(u):
+            reverse[v].append(u)
+    return reverse
+
+
+def _bfs_discoveries(graph: Graph, start: Any, direction_optimizing: bool):
+    """
+    The BFS engine. Yields `(from, to, level)` once for every vertex reachable from `start`, level by level. The
+    frontier is a plain list, and each level is expanded either top-down (scan the out-edges of the frontier) or, if
+    `direction_optimizing` is set and the frontier is large, bottom-up (scan the in-edges of the unvisited vertices
+    until one of them is in the frontier).
+    """
+    yield None, start, 0
+    visited = {start}
+    frontier = [start]
+    level = 1
+    reverse = None
+    remaining_edges = 0
+    if direction_optimizing:
+        num_vertices = len(graph.vertices())
+        remaining_edges = sum(map(lambda v: len(graph.get_neighbours(v)), graph.vertices()))
+    bottom_up = False
+
+    while len(frontier) > 0:
+        if direction_optimizing:
+            frontier_edges = sum(map(lambda v: len(graph.get_neighbours(v)), frontier))
+            remaining_edges -= frontier_edges
+            if not bottom_up and frontier_edges > remaining_edges / _BOTTOM_UP_ALPHA:
+                bottom_up = True
+            elif bottom_up and len(frontier) < num_vertices / _BOTTOM_UP_BETA:
+                bottom_up = False
+
+        next_frontier = list()
+        if bottom_up:
+            if reverse is None:
+                reverse = _reverse_adjacency(graph)
+            in_frontier = set(frontier)
+            for v, sources in reverse.items():
+                if v in visited:
+                    continue
+                for u in sources:
+                    if u in in_frontier:
+                        next_frontier.append(v)
+                        yield u, v, level
+                        break
+            visited.update(next_frontier)
+        else:
+            for u in frontier:
+                for v, _ in graph.get_neighbours(u):
+                    if v not in visited:
+                        visited.add(v)
+                        next_frontier.append(v)
+                        yield u, v, level
+        frontier = next_frontier
+        level += 1
+
+
+def bfs(
+        graph: Graph,
+        start: Any,
+        bfs_callback: Callable[[Tuple[Any, Any, int]], type(None)],
+        direction_optimizing: bool = False):
     """
     This function implements bread first search on an object of type Graph. Complexity of such an algorithm is upper
-    bound by `O(v)` where `v` is the number of vertices.
+    bound by `O(v + e)` where `v` is the number of vertices and `e` the number of edges.
 
-    It returns a map representing the predecessor relationship and "levels" of vertices. Example, consider the graph
+    The callback is called once for every reachable vertex, with the vertex it was discovered from and its level.
+    Example, consider the graph
 
     ```
     A -- B
@@ -22,58 +94,157 @@ def bfs(graph: Graph, start: Any, bfs_callback: Callable[[Tuple[Any, Any, int]],
           `-- E
     ```
 
-    Starting from A, the `bfs` function will return a map like this:
-    {
-      "A": (None, 0),
-      "B": ("A", 1),
-      "C": ("A", 1),
-      "D": ("C", 2),
-      "E": ("C",2)
-    }
-    This structure can be used to trace paths between the start to any reachable vertex.
+    Starting from A, the `bfs` function will call the callback with:
+    (None, "A", 0)
+    ("A", "B", 1)
+    ("A", "C", 1)
+    ("C", "D", 2)
+    ("C", "E", 2)
+    Collecting these can be used to trace paths between the start to any reachable vertex. `bfs_tree` does exactly
+    that without the callback.
 
     :param graph: The Digraph to traverse
     :param start: The starting point
     :param bfs_callback: The function to call at each visit. it is called as callable((from, to, level)) and returns nothing.
+    :param direction_optimizing: Switch to bottom-up steps when the frontier is large. This pays off on graphs with a
+    small diameter, but builds the reverse adjacency of the graph the first time it switches.
     """
-    visited = set()
-    if start in graph:
-        bfs_callback((None, start, 0))
-        visited.add(start)
-    else:
+    if start not in graph:
         return
-    frontier = {start}
+    for discovery in _bfs_discoveries(graph, start, direction_optimizing):
+        bfs_callback(discovery)
+
+
+def bfs_tree(graph: Graph, start: Any, direction_optimizing: bool = False) -> (dict, dict):
+    """
+    Same as `bfs`, but instead of calling a callback, it returns the BFS tree as a tuple of 2 dictionaries: the
+    predecessor of every reachable vertex (None for `start`) and its level.
+
+    :param graph: The Digraph to traverse
+    :param start: The starting point
+    :param direction_optimizing: See `bfs`
+    :return: A tuple (predecessors, levels).
+    """
+    parents = dict()
+    levels = dict()
+    if start not in graph:
+        return parents, levels
+    for u, v, level in _bfs_discoveries(graph, start, direction_optimizing):
+        parents[v] = u
+        levels[v] = level
+    return parents, levels
+
+
+def bfs_arrays(graph: CSRGraph, start: Any, direction_optimizing: bool = False) -> (array, array):
+    """
+    BFS over the integer ids of a `CSRGraph`, without translating to labels or building dictionaries. It returns 2
+    arrays indexed by vertex id: the id of the predecessor of every vertex and its level. Both are -1 for vertices that
+    are not reachable, and the predecessor of `start` is -1 as well.
+
+    :param graph: The graph to traverse
+    :param start: The starting vertex (a label, like everywhere else)
+    :param direction_optimizing: See `bfs`
+    :return: A tuple (predecessors, levels).
+    """
+    n = graph.num_vertices()
+    parents = array("q", [-1]) * n
+    levels = array("q", [-1]) * n
+    start_id = graph.vertex_id(start)
+    if start_id is None:
+        return parents, levels
+    offsets, targets = graph.offsets, graph.targets
+    levels[start_id] = 0
+    frontier = [start_id]
     level = 1
+    remaining_edges = len(targets)
+    bottom_up = False
+    reverse_offsets, reverse_sources = None, None
+
     while len(frontier) > 0:
-        next_frontier_detailed = set(
-            filter(
-                lambda t: t[1] not in visited,
-                flatten_to_tuple(
-                    [[(u, v, level) for v, _ in graph.get_neighbours(u)] for u in frontier]
-                )
-
-            )
-        )
-        foreach(
-            bfs_callback,
-            next_frontier_detailed
-        )()
-        next_frontier = set(
-            map(
-                lambda t: t[1],
-                next_frontier_detailed
-            )
-        )
-        visited.update(next_frontier)
+        if direction_optimizing:
+            frontier_edges = sum([offsets[u + 1] - offsets[u] for u in frontier])
+            remaining_edges -= frontier_edges
+            if not bottom_up and frontier_edges > remaining_edges / _BOTTOM_UP_ALPHA:
+                bottom_up = True
+            elif bottom_up and len(frontier) < n / _BOTTOM_UP_BETA:
+                bottom_up = False
+
+        next_frontier = list()
+        if bottom_up:
+            if reverse_offsets is None:
+                reverse_offsets, reverse_sources = _reverse_csr(graph)
+            in_frontier = bytearray(n)
+            for u in frontier:
+                in_frontier[u] = 1
+            for v in range(n):
+                if levels[v] != -1:
+                    continue
+                for u in reverse_sources[reverse_offsets[v]:reverse_offsets[v + 1]]:
+                    if in_frontier[u]:
+                        parents[v] = u
+                        levels[v] = level
+                        next_frontier.append(v)
+                        break
+        else:
+            for u in frontier:
+                for v in targets[offsets[u]:offsets[u + 1]]:
+                    if levels[v] == -1:
+                        parents[v] = u
+                        levels[v] = level
+                        next_frontier.append(v)
         frontier = next_frontier
         level += 1
+    return parents, levels
 
 
-def _dfs_callback(graph: Graph, start, parents: dict):
-    for n in map(lambda x: x[0], graph.get_neighbours(start)):
-        if n not in parents:
-            parents[n] = start
-            _dfs_callback(graph, n, parents)
+def _reverse_csr(graph: CSRGraph) -> (array, array):
+    """
+    Returns the offsets and sources of the in-edges of a `CSRGraph`, built with a counting sort. An undirected graph
+    already stores every edge both ways, so its own arrays are returned.
+    """
+    if not graph.directed:
+        return graph.offsets, graph.targets
+    n = graph.num_vertices()
+    offsets, targets = graph.offsets, graph.targets
+    reverse_offsets = array("q", [0]) * (n + 1)
+    for v in targets:
+        reverse_offsets[v + 1] += 1
+    for v in range(n):
+        reverse_offsets[v + 1] += reverse_offsets[v]
+    fill = array("q", reverse_offsets)
+    reverse_sources = array("q", [0]) * len(targets)
+    for u in range(n):
+        for v in targets[offsets[u]:offsets[u + 1]]:
+            reverse_sources[fill[v]] = u
+            fill[v] += 1
+    return reverse_offsets, reverse_sources
+
+
+_PRE_ORDER = 0
+_POST_ORDER = 1
+
+
+def _dfs_events(graph: Graph, start, visited: set):
+    """
+    The DFS engine. It keeps an explicit stack of `(vertex, neighbour iterator)` pairs instead of recursing, so the
+    depth of the graph is only limited by memory. Yields `(_PRE_ORDER, vertex, parent)` when a vertex is first
+    reached and `(_POST_ORDER, vertex, parent)` when all of its descendants are done, visiting neighbours in the order
+    `get_neighbours` returns them. `start` is assumed to be unvisited.
+    """
+    visited.add(start)
+    yield _PRE_ORDER, start, None
+    stack = [(start, None, iter(graph.get_neighbours(start)))]
+    while len(stack) > 0:
+        u, parent, neighbours = stack[-1]
+        for v, _ in neighbours:
+            if v not in visited:
+                visited.add(v)
+                yield _PRE_ORDER, v, u
+                stack.append((v, u, iter(graph.get_neighbours(v))))
+                break
+        else:
+            stack.pop()
+            yield _POST_ORDER, u, parent
 
 
 def dfs(graph: Graph, start):
@@ -106,16 +277,58 @@ def dfs(graph: Graph, start):
     """
     if start not in graph:
         return dict()
-    parents = {start: None}
-    _dfs_callback(graph, start, parents)
+    parents = dict()
+    for event, v, parent in _dfs_events(graph, start, set()):
+        if event == _PRE_ORDER:
+            parents[v] = parent
     return parents
 
 
+def dfs_preorder(graph: Graph, start):
+    """
+    A generator yielding the vertices reachable from `start` in DFS pre-order, i.e. as they are first reached. Since
+    it is lazy, the caller can stop as soon as it has found what it is looking for.
+
+    :param graph: The Digraph to traverse
+    :param start: The starting point
+    :return: A generator of vertices
+    """
+    if start not in graph:
+        return
+    for event, v, _ in _dfs_events(graph, start, set()):
+        if event == _PRE_ORDER:
+            yield v
+
+
+def dfs_postorder(graph: Graph, start, visited: set = None):
+    """
+    A generator yielding the vertices reachable from `start` in DFS post-order, i.e. once all of their descendants
+    have been yielded.
+
+    :param graph: The Digraph to traverse
+    :param start: The starting point
+    :param visited: Vertices to treat as already visited. It is updated as the traversal goes, which allows continuing
+    a traversal from another start without revisiting anything
+    :return: A generator of vertices
+    """
+    if start not in graph:
+        return
+    visited = set() if visited is None else visited
+    if start in visited:
+        return
+    for event, v, _ in _dfs_events(graph, start, visited):
+        if event == _POST_ORDER:
+            yield v
+
+
 def dijkstra(graph: Graph, start) -> (dict, dict):
     """
     This implements the dijkstra's algorithm fpr shortest path. It returns a tuple containing 2 dictionaries:
     a map of distances of vertices from `start` and another congaing the predecessor of each vertex.
 
+    The frontier is kept in an `IndexedMinHeap`, so that relaxing an edge is a `decrease_key` and the complexity is
+    `O((v + e)log(v))`.
+
     NOTE: The input type is `Graph`. There is no separate interface for a di-graph in this library. Implementations of
     the `Graph` class must make it a di-graph. Otherwise this algorithm will hang.
 
@@ -130,83 +343,144 @@ def dijkstra(graph: Graph, start) -> (dict, dict):
     d = dict([(v, float('inf')) for v in graph.vertices()])
     predecessors = dict([(v, None) for v in graph.vertices()])
     d[start] = 0
+    done = set()
+    heap = IndexedMinHeap()
+    heap.insert(start, 0)
 
-    class HeapElement:
-        def __init__(self, vertex):
-            self.vertex = vertex
+    # Relax and repeat
+    while len(heap) > 0:
+        u, du = heap.extract_extreme()
+        done.add(u)
+        for v, ppt in graph.get_neighbours(u):
+            if v not in done and d[v] > du + ppt:
+                d[v] = du + ppt
+                predecessors[v] = u
+                if v in heap:
+                    heap.decrease_key(v, d[v])
+                else:
+                    heap.insert(v, d[v])
+    return d, predecessors
 
-        def __key__(self):
-            return d[self.vertex]
 
-    heap = MinHeap.from_iterable(list(map(lambda v: HeapElement(v), d.keys())))
+def dijkstra_lazy(graph: Graph, start) -> (dict, dict):
+    """
+    Same as `dijkstra`, but instead of maintaining handles into the heap, a relaxed vertex is pushed again and stale
+    entries are skipped when they are popped. This trades some extra heap entries (up to `e`) for not having to keep a
+    position map, which is cheaper on graphs where most vertices are relaxed only once.
+
+    :param graph: The Digraph to traverse
+    :param start: The starting point
+    :return: A tuple (distances from start, predecessors).
+    """
+    if start not in graph:
+        return dict(), dict()
+
+    d = dict([(v, float('inf')) for v in graph.vertices()])
+    predecessors = dict([(v, None) for v in graph.vertices()])
+    d[start] = 0
+    done = set()
+    # The counter breaks ties so that vertices themselves are never compared
+    heap = [(0, 0, start)]
+    counter = 1
 
-    # Relax and repeat
     while len(heap) > 0:
-        min_elem = heap.extract_extreme()
-        u = min_elem.vertex
+        du, _, u = heappop(heap)
+        if u in done:
+            continue
+        done.add(u)
         for v, ppt in graph.get_neighbours(u):
-            if d[v] > d[u] + ppt:
-                d[v] = d[u] + ppt
+            if v not in done and d[v] > du + ppt:
+                d[v] = du + ppt
                 predecessors[v] = u
-        heap.build_heap()
+                heappush(heap, (d[v], counter, v))
+                counter += 1
     return d, predecessors
 
 
-def _shortest_path_dag_explorer(graph: Graph, predecessors: dict, memo: dict, start, end):
-    if start == end:
-        return 0
-    elif (start, end) in memo:
-        return memo[(start, end)]
-    else:
-        neighbours = graph.get_neighbours(start)
-        if neighbours is None:
-            return float('inf')
-        if len(neighbours) == 0:
-            return float('inf')
-        sp, n = min(
-            [(_shortest_path_dag_explorer(graph, predecessors, memo, n, end) + ppt, n) for n, ppt in neighbours]
-        )
-        if sp != float('inf'):
-            memo[(start, end)] = sp
-            predecessors[n] = start
-        return sp
+def dag_shortest_paths(graph: Graph, start, longest: bool = False) -> (dict, dict):
+    """
+    Single source shortest (or longest) paths in a DAG. The vertices reachable from `start` are put in topological
+    order with an iterative DFS, and the edges are relaxed in that order, which is `O(v + e)` and, unlike dijkstra,
+    works with negative edge properties too. Like `dijkstra`, it returns the distances and predecessors of all the
+    vertices at once, so any number of targets can be looked up from one call. Use `path_to` to get the actual path.
+
+    NOTE: The graph has to be acyclic. This is not checked, and the result is meaningless on a graph with cycles.
+
+    :param graph: The DAG to traverse
+    :param start: The starting point
+    :param longest: Compute longest paths instead of shortest ones
+    :return: A tuple (distances from start, predecessors). Unreachable vertices are at a distance of `inf` (`-inf`
+    for longest paths).
+    """
+    if start not in graph:
+        return dict(), dict()
+
+    unreachable = float('-inf') if longest else float('inf')
+    d = dict([(v, unreachable) for v in graph.vertices()])
+    predecessors = dict([(v, None) for v in graph.vertices()])
+    d[start] = 0
+
+    for u in reversed(list(dfs_postorder(graph, start))):
+        du = d[u]
+        for v, ppt in graph.get_neighbours(u):
+            if (du + ppt > d[v]) if longest else (du + ppt < d[v]):
+                d[v] = du + ppt
+                predecessors[v] = u
+    return d, predecessors
+
+
+def path_to(predecessors: dict, end) -> list:
+    """
+    Walks a predecessors map, as returned by `dijkstra`, `dag_shortest_paths` or `bfs_tree`, back from `end`.
+    :param predecessors: The predecessors map
+    :param end: The vertex to find the path to
+    :return: The list of vertices from the start to `end`, or an empty list if `end` is not in the map. Unreachable
+    vertices have no predecessor just like the start, so check their distance first
+    """
+    if end not in predecessors:
+        return list()
+    path = [end]
+    while predecessors[path[-1]] is not None:
+        path.append(predecessors[path[-1]])
+    path.reverse()
+    return path
 
 
 def shortest_path_dag(graph: Graph, start, end) -> (float, dict):
     """
-    This function implements a special case SP algorithm for DAGs. Since it's a DAG, we can do this in a dynamic graph
-    as well.
-    NOTE: This
+    This function implements a special case SP algorithm for DAGs. It is a thin wrapper over `dag_shortest_paths`; to
+    query many targets from the same start, call that directly.
     :param graph: The Digraph to traverse
     :param start: The starting point
     :param end: The ending point
-    :return: A tuple (shortest path, predecessors map).
+    :return: A tuple (shortest path, predecessors map along the path).
     """
-    memo = dict()
-    predecessors = {start: None}
-    sp = _shortest_path_dag_explorer(graph, predecessors, memo, start, end)
-    return sp, predecessors
-
-
-def _trace_callback(graph: Graph, curr_node: Any, trace_path: Sequence[Any], next_idx: int, visited: set) -> bool:
-    if next_idx == len(trace_path):
-        return True
-    next_node = trace_path[next_idx]
-    for n, _ in graph.get_neighbours(curr_node):
-        if n not in visited and n == next_node:
-            visited.add(n)
-            retval = _trace_callback(graph, n, trace_path, next_idx+1, visited)
-            if retval:
-                return True
-    visited.remove(curr_node)
-    return False
+    if start == end:
+        return 0, {start: None}
+    d, predecessors = dag_shortest_paths(graph, start)
+    if d.get(end, float('inf')) == float('inf'):
+        return float('inf'), {start: None}
+    path = path_to(predecessors, end)
+    return d[end], dict([(v, predecessors[v]) for v in path])
 
 
 def trace(graph: Graph, path: Sequence):
+    """
+    Tells if a path can be walked in a graph, i.e. every vertex in it has an edge to the next one and no vertex
+    appears twice.
+
+    :param graph: The Digraph to check against
+    :param path: A sequence of vertices
+    :return: Boolean
+    """
     if len(path) == 0:
         return True
     if path[0] not in graph:
         return False
     visited = {path[0]}
-    return _trace_callback(graph, path[0], path, 1, visited)
-
+    for idx in range(1, len(path)):
+        curr_node, next_node = path[idx - 1], path[idx]
+        if next_node in visited or not any(map(lambda n: n[0] == next_node, graph.get_neighbours(curr_node))):
+            return False
+        visited.add(next_node)
+    return True
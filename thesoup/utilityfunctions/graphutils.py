@@ -1,13 +1,9 @@
-from thesoup.utilityclasses.graph import Graph
+from heapq import heapify, heappop
+from typing import Iterable
+from thesoup.utilityclasses.graph import Edge, Graph
 from thesoup.utilityclasses.disjointsets import DisjointSets
-
-
-def _topological_explore(graph: Graph, visited: set, stk: list, start):
-    if start not in visited:
-        visited.add(start)
-        for c, _ in graph.get_neighbours(start):
-            _topological_explore(graph, visited, stk, c)
-        stk.append(start)
+from thesoup.utilityclasses.heap import IndexedMinHeap
+from thesoup.utilityfunctions.graphtraversals import dfs_postorder
 
 
 def topological_sort(graph: Graph) -> list:
@@ -20,25 +16,95 @@ def topological_sort(graph: Graph) -> list:
     visited = set()
     stk = list()
     for v in vertices:
-        _topological_explore(graph, visited, stk, v)
+        stk.extend(dfs_postorder(graph, v, visited))
     return reversed(stk)
 
 
+def kruskal_edges(vertices: Iterable, edges: Iterable[Edge], presorted: bool = False) -> set:
+    """
+    Kruskal's algorithm over an arbitrary source of edges. Unless `presorted` is set, the edges are put in a heap in
+    `O(e)` and popped in increasing order of their property only until the tree is complete, so the full sort is
+    never paid for. If `presorted` is set, `edges` is consumed lazily as a stream, which allows feeding it edges that
+    are already sorted on disk, or the output of a k-way merge.
+
+    If the vertices do not form a connected graph, the result is a minimum spanning forest.
+
+    :param vertices: All the vertices
+    :param edges: An iterable of `Edge` structs
+    :param presorted: Whether `edges` yields the edges in increasing order of their property
+    :return: The set of edges in the minimum spanning forest
+    """
+    ds = DisjointSets(vertices)
+    needed = len(ds) - 1
+    selected_edges = set()
+
+    if presorted:
+        ordered = edges
+    else:
+        # The counter breaks ties between equal properties, so that edges are never compared directly
+        heap = [(edge.ppt, idx, edge) for idx, edge in enumerate(edges)]
+        heapify(heap)
+        ordered = map(lambda _: heappop(heap)[2], range(len(heap)))
+
+    if needed <= 0:
+        return selected_edges
+    for edge in ordered:
+        if ds.union(edge.src, edge.destination):
+            selected_edges.add(edge)
+            if len(selected_edges) == needed:
+                break
+    return selected_edges
+
+
 def kruskal(graph: Graph) -> set:
     """
-    This function implements the Kruskal's algorithm to find the min cost spanning tree of a di-graph
+    This function implements the Kruskal's algorithm to find the min cost spanning tree of an undirected graph. If
+    the graph is not connected, it returns a minimum spanning forest.
+    :param graph: The input graph
+    :return: A set of the edges comprising the MCST
+    """
+    return kruskal_edges(graph.vertices(), graph.edges())
+
+
+def prim(graph: Graph, start=None) -> set:
+    """
+    This function implements Prim's algorithm to find the min cost spanning tree of an undirected graph, i.e. one
+    that stores each edge in both directions. The vertices outside the tree are kept in an `IndexedMinHeap` keyed on
+    the cheapest edge connecting them to the tree, which makes it `O((v + e)log(v))`.
+
+    The edges are returned with the smaller vertex as the source, the way `AdjListUndirectedDiGraph.edges` reports
+    them.
+
     :param graph: The input graph
-    :return: A list of the edges comprising the MCST
+    :param start: The vertex to grow the tree from. If None, a tree is grown from every component in turn, giving a
+    minimum spanning forest
+    :return: A set of the edges comprising the MCST
     """
-    sorted_edges = sorted(graph.edges())
-    ds = DisjointSets(graph.vertices())
+    if start is not None and start not in graph:
+        return set()
     selected_edges = set()
+    in_tree = set()
+    roots = [start] if start is not None else graph.vertices()
 
-    for edge in sorted_edges:
-        src, dest = edge.src, edge.destination
-        if ds.find_set(src) != ds.find_set(dest):
-            ds.union(src, dest)
-        selected_edges.add(edge)
-        if len(ds) == 1:
-            break
+    for root in roots:
+        if root in in_tree:
+            continue
+        best_edges = dict()
+        heap = IndexedMinHeap()
+        heap.insert(root, 0)
+        while len(heap) > 0:
+            u, _ = heap.extract_extreme()
+            in_tree.add(u)
+            if u in best_edges:
+                selected_edges.add(best_edges.pop(u))
+            for v, ppt in graph.get_neighbours(u):
+                if v in in_tree:
+                    continue
+                if v not in heap:
+                    heap.insert(v, ppt)
+                elif ppt < heap[v]:
+                    heap.decrease_key(v, ppt)
+                else:
+                    continue
+                best_edges[v] = Edge(u, v, ppt) if v > u else Edge(v, u, ppt)
     return selected_edges
@@ -1,30 +1,212 @@
+import os
+from array import array
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from heapq import heapify, heappop, heapreplace
+from multiprocessing.shared_memory import SharedMemory
+from typing import Callable
+
+from thesoup.utilityclasses.heap import ReverseKey
+
+
+def kway_merge(*iterables, key: Callable = None, reverse: bool = False):
+    """
+    This function lazily merges K individually sorted iterables into a single sorted stream. It keeps a heap of the
+    current head of each iterable, so it holds K elements at a time and takes `O(log(K))` per element. The iterables
+    can be anything, including generators or open files, and they are only read as far as needed.
+
+    Elements that compare equal come out in the order of the iterables they came from.
+
+    :param iterables: A vararg of sorted iterables
+    :param key: A function of one argument that returns the key the iterables are sorted by. The elements themselves
+                are compared if not passed
+    :param reverse: True if the iterables are sorted in descending order
+    :return: A generator of the merged elements
+    """
+    if key is None and not reverse:
+        sort_key = None
+    elif key is None:
+        sort_key = ReverseKey
+    elif not reverse:
+        sort_key = key
+    else:
+        def sort_key(elem):
+            return ReverseKey(key(elem))
+
+    # Entries are [key, position of the iterable, element, iterator]. The position breaks ties, so neither elements nor
+    # iterators are ever compared.
+    heap = []
+    exhausted = object()
+    for position, iterable in enumerate(iterables):
+        iterator = iter(iterable)
+        elem = next(iterator, exhausted)
+        if elem is not exhausted:
+            heap.append([elem if sort_key is None else sort_key(elem), position, elem, iterator])
+    heapify(heap)
+
+    while len(heap) > 1:
+        entry = heap[0]
+        yield entry[2]
+        elem = next(entry[3], exhausted)
+        if elem is exhausted:
+            heappop(heap)
+        else:
+            entry[0] = elem if sort_key is None else sort_key(elem)
+            entry[2] = elem
+            heapreplace(heap, entry)
+
+    if heap:
+        _, _, elem, iterator = heap[0]
+        yield elem
+        yield from iterator
+
+
 def merge(*arrays: list) -> list:
     """
-    This function merges K individually sorted lists into a single sorted list. Complexity is `KNlog(N)`, where we are
-    merging K arrays of N size each.
+    This function merges K individually sorted lists into a single sorted list. Complexity is `KNlog(K)`, where we are
+    merging K arrays of N size each. See `kway_merge` to merge lazily.
     :params arrays: A vararg of lists.
     :return: A new merged list.
     """
     if len(arrays) == 1:
         return arrays[0]
-    semi_merged_list = list()
-    for i in range(0, len(arrays)-1, 2):
-        it1 = 0
-        it2 = 0
-        semi_merged_list.append(list())
-        while it1 < len(arrays[i]) and it2 < len(arrays[i+1]):
-            if arrays[i][it1] < arrays[i+1][it2]:
-                semi_merged_list[-1].append(arrays[i][it1])
-                it1 += 1
+    return list(kway_merge(*arrays))
+
+
+def parallel_merge(*arrays, workers: int = None, partitions: int = None):
+    """
+    This function merges K individually sorted sequences into a single sorted one, in a pool of processes. The output
+    is split into `partitions` ranges of equal size. The position where each range starts in every input is found by
+    binary search (co-ranking), so every range is a slice of each input, and the slices of each range are merged by a
+    different worker. The ranges are then laid end to end. The ranges stay balanced however many duplicates there are.
+
+    If all the inputs are `array.array`s of the same numeric typecode, they are copied into shared memory, and workers
+    read their slices from and write their output into shared memory directly, so no elements are pickled. Otherwise,
+    slices are sent to the workers. If all the inputs are arrays of the same typecode, the result is an array of that
+    typecode, and a list otherwise.
+
+    Like `merge`, equal elements come out in the order of the inputs they came from.
+
+    :param arrays: A vararg of sorted lists or arrays
+    :param workers: The number of processes. The number of CPUs if not passed. With 1, the merge happens in process
+    :param partitions: The number of ranges the output is split into. The number of workers if not passed
+    :return: A merged list, or an array if all the inputs are arrays with the same typecode
+    """
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    partitions = workers if partitions is None else partitions
+    typecodes = set(arr.typecode if type(arr) == array else None for arr in arrays)
+    typecode = typecodes.pop() if len(typecodes) == 1 else None
+
+    if workers <= 1 or partitions <= 1 or sum(len(arr) for arr in arrays) == 0:
+        merged = kway_merge(*arrays)
+        return list(merged) if typecode is None else array(typecode, merged)
+
+    splits = _split_points(arrays, partitions)
+    ranges = [
+        [(splits[part][i], splits[part + 1][i]) for i in range(len(arrays))] for part in range(len(splits) - 1)
+    ]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        if typecode is not None and typecode in _SHARED_TYPECODES:
+            return _shared_merge(pool, arrays, ranges, typecode)
+        merged = list() if typecode is None else array(typecode)
+        tasks = [[arr[start:stop] for arr, (start, stop) in zip(arrays, slices)] for slices in ranges]
+        for part in pool.map(_merge_slices, tasks):
+            merged.extend(part)
+        return merged
+
+
+_SHARED_TYPECODES = "bBhHiIlLqQfd"
+
+
+def _split_points(arrays, partitions: int) -> list:
+    # Returns, for each boundary between 2 ranges of the output, the index of that boundary in every input.
+    total = sum(len(arr) for arr in arrays)
+    splits = [[0] * len(arrays)]
+    for part in range(1, partitions):
+        splits.append(_co_rank(arrays, total * part // partitions))
+    splits.append([len(arr) for arr in arrays])
+    return splits
+
+
+def _co_rank(arrays, rank: int) -> list:
+    # Returns how many elements of each input are among the first `rank` elements of the merged output. Equal elements
+    # come from the inputs in order, like in `kway_merge`.
+    if rank == 0:
+        return [0] * len(arrays)
+
+    # The value of the last of those elements is the smallest value with at least `rank` elements up to it.
+    value = None
+    for arr in arrays:
+        lo, hi = 0, len(arr)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if sum(bisect_right(other, arr[mid]) for other in arrays) >= rank:
+                hi = mid
             else:
-                semi_merged_list[-1].append(arrays[i+1][it2])
-                it2 += 1
-        while it1 < len(arrays[i]):
-            semi_merged_list[-1].append(arrays[i][it1])
-            it1 += 1
-        while it2 < len(arrays[i+1]):
-            semi_merged_list[-1].append(arrays[i+1][it2])
-            it2 += 1
-    if len(arrays) % 2 == 1:
-        semi_merged_list.append(arrays[-1])
-    return merge(*semi_merged_list)
+                lo = mid + 1
+        if lo < len(arr) and (value is None or arr[lo] < value):
+            value = arr[lo]
+
+    # Every element smaller than the value is in, and the rest are copies of the value, taken from the first inputs.
+    splits = [bisect_left(arr, value) for arr in arrays]
+    remaining = rank - sum(splits)
+    for i, arr in enumerate(arrays):
+        taken = min(remaining, bisect_right(arr, value) - splits[i])
+        splits[i] += taken
+        remaining -= taken
+    return splits
+
+
+def _merge_slices(slices: list) -> list:
+    return list(kway_merge(*slices))
+
+
+def _shared_merge(pool: ProcessPoolExecutor, arrays, ranges: list, typecode: str) -> array:
+    itemsize = array(typecode).itemsize
+    total = sum(len(arr) for arr in arrays)
+    source = SharedMemory(create=True, size=max(1, total * itemsize))
+    target = SharedMemory(create=True, size=max(1, total * itemsize))
+    try:
+        offsets = [0]
+        for arr in arrays:
+            source.buf[offsets[-1] * itemsize:(offsets[-1] + len(arr)) * itemsize] = memoryview(arr).cast("B")
+            offsets.append(offsets[-1] + len(arr))
+
+        tasks = list()
+        output_start = 0
+        for slices in ranges:
+            tasks.append((
+                source.name,
+                target.name,
+                typecode,
+                [(offsets[i] + start, offsets[i] + stop) for i, (start, stop) in enumerate(slices)],
+                output_start
+            ))
+            output_start += sum(stop - start for start, stop in slices)
+        for _ in pool.map(_merge_shared_slices, *zip(*tasks)):
+            pass
+
+        merged = array(typecode)
+        merged.frombytes(target.buf[:total * itemsize])
+        return merged
+    finally:
+        for shared in [source, target]:
+            shared.close()
+            shared.unlink()
+
+
+def _merge_shared_slices(source_name: str, target_name: str, typecode: str, slices: list, output_start: int):
+    itemsize = array(typecode).itemsize
+    source = SharedMemory(name=source_name)
+    target = SharedMemory(name=target_name)
+    # Views into a shared memory block have to be released before it is closed.
+    views = [source.buf[start * itemsize:stop * itemsize].cast(typecode) for start, stop in slices]
+    try:
+        merged = array(typecode, kway_merge(*views))
+        with target.buf[output_start * itemsize:(output_start + len(merged)) * itemsize] as output:
+            output[:] = memoryview(merged).cast("B")
+    finally:
+        for view in views:
+            view.release()
+        source.close()
+        target.close()
@@ -9,6 +9,8 @@ def is_anagram(s1: str, s2: str) -> bool:
     :param s1: The first string
     :param s2: The second string
     """
+    if len(s1) != len(s2):
+        return False
     counts1 = CountSet(s1)
     counts2 = CountSet(s2)
     return counts1 == counts2
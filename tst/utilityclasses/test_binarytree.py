@@ -1,6 +1,7 @@
+import random
 import unittest
 
-from thesoup.utilityclasses.binarytree import BinarySearchTree
+from thesoup.utilityclasses.binarytree import AVLTree, BinarySearchTree, SortedListTree
 
 
 class TestBinarySearchTree (unittest.TestCase):
@@ -33,3 +34,195 @@ class TestBinarySearchTree (unittest.TestCase):
             tree.insert(item)
         iterated_items = [item for item in tree]
         self.assertEqual(sorted(sample_data), iterated_items)
+
+    def test_duplicate_deletes(self):
+        tree = BinarySearchTree()
+        for item in [5, 5, 3, 3, 8]:
+            tree.insert(item)
+        del tree[5]
+        self.assertEqual([3, 3, 5, 8], list(tree))
+        del tree[5]
+        del tree[3]
+        del tree[3]
+        del tree[8]
+        self.assertEqual(0, len(tree))
+        self.assertEqual([], list(tree))
+
+    def test_deleting_left_child_with_max(self):
+        tree = BinarySearchTree()
+        for item in [10, 5, 15]:
+            tree.insert(item)
+        del tree[10]
+        self.assertEqual([5, 15], list(tree))
+
+    def test_bulk_load(self):
+        tree = BinarySearchTree.from_sorted([1, 2, 2, 3, 5, 8, 13])
+        self.assertEqual(7, len(tree))
+        self.assertEqual([1, 2, 2, 3, 5, 8, 13], list(tree))
+        self.assertEqual(2, tree.select(2))
+        self.assertEqual(5, tree.root())
+        with self.assertRaises(ValueError):
+            BinarySearchTree.from_sorted([1, 3, 2])
+        self.assertEqual([], list(BinarySearchTree.from_sorted([])))
+
+        tree = BinarySearchTree.from_iterable([9, 4, 4, 1])
+        tree.insert(5)
+        del tree[4]
+        self.assertEqual([1, 4, 5, 9], list(tree))
+
+    def test_merge(self):
+        left = BinarySearchTree.from_iterable([5, 1, 9, 9])
+        right = AVLTree.from_iterable([2, 9, 7])
+        merged = left.merge(right)
+        self.assertEqual(BinarySearchTree, type(merged))
+        self.assertEqual([1, 2, 5, 7, 9, 9, 9], list(merged))
+        self.assertEqual([1, 5, 9, 9], list(left))
+        self.assertEqual(AVLTree, type(right.merge(left)))
+
+
+class TestOrderStatistics (unittest.TestCase):
+    def _check(self, tree, expected: list):
+        self.assertEqual(len(expected), len(tree))
+        for k, item in enumerate(expected):
+            self.assertEqual(item, tree.select(k))
+        for probe in range(-1, 32):
+            below = [e for e in expected if e < probe]
+            above = [e for e in expected if e >= probe]
+            self.assertEqual(len(below), tree.rank(probe))
+            self.assertEqual(max([e for e in expected if e <= probe], default=None), tree.floor(probe))
+            self.assertEqual(min(above, default=None), tree.ceiling(probe))
+            for hi in [probe, probe + 3, 40]:
+                in_range = [e for e in expected if probe <= e < hi]
+                self.assertEqual(in_range, list(tree.range(probe, hi)))
+                self.assertEqual(len(in_range), tree.count_range(probe, hi))
+        with self.assertRaises(IndexError):
+            tree.select(len(expected))
+
+    def test_order_statistics(self):
+        for tree in [BinarySearchTree(), AVLTree(), SortedListTree(load=4)]:
+            expected = []
+            for _ in range(300):
+                item = random.randint(0, 30)
+                if random.random() < 0.3 and len(expected) > 0:
+                    item = random.choice(expected)
+                    expected.remove(item)
+                    del tree[item]
+                else:
+                    expected.append(item)
+                    tree.insert(item)
+            self._check(tree, sorted(expected))
+
+
+class TestAVLTree (unittest.TestCase):
+    def _assert_balanced(self, tree: AVLTree):
+        def _check(node, lo, hi):
+            if node is None:
+                return 0
+            self.assertTrue(lo is None or node() > lo)
+            self.assertTrue(hi is None or node() < hi)
+            if node.left is not None:
+                self.assertIs(node, node.left.parent)
+            if node.right is not None:
+                self.assertIs(node, node.right.parent)
+            left, right = _check(node.left, lo, node()), _check(node.right, node(), hi)
+            self.assertTrue(abs(left - right) <= 1)
+            self.assertEqual(1 + max(left, right), node.height)
+            return 1 + max(left, right)
+        if tree.root is not None:
+            self.assertIsNone(tree.root.parent)
+        _check(tree.root, None, None)
+
+    def test_sorted_inserts(self):
+        tree = AVLTree()
+        for item in range(10000):
+            tree.insert(item)
+        self.assertEqual(10000, len(tree))
+        self.assertTrue(tree.root.height <= 15)
+        self._assert_balanced(tree)
+        self.assertEqual(list(range(10000)), list(tree))
+
+    def test_bulk_load(self):
+        tree = AVLTree.from_sorted(range(1000))
+        self._assert_balanced(tree)
+        self.assertEqual(500, tree.rank(500))
+        for item in range(1000, 2000):
+            tree.insert(item)
+        for item in range(0, 2000, 3):
+            del tree[item]
+        self._assert_balanced(tree)
+        self.assertEqual([item for item in range(2000) if item % 3 != 0], list(tree))
+
+    def test_duplicates_and_deletes(self):
+        tree = AVLTree()
+        sample_data = [12, 1, 1, 23, 36, 36, 17, 6, 8, 44, 9]
+        for item in sample_data:
+            tree.insert(item)
+        self.assertEqual(sorted(sample_data), list(tree))
+        del tree[36]
+        self.assertTrue(36 in tree)
+        del tree[36]
+        self.assertFalse(36 in tree)
+        del tree[12]
+        del tree[100]
+        self.assertEqual(8, len(tree))
+        self.assertEqual([1, 1, 6, 8, 9, 17, 23, 44], list(tree))
+        self._assert_balanced(tree)
+
+    def test_smoke(self):
+        tree = AVLTree()
+        expected = []
+        for _ in range(2000):
+            item = random.randint(1, 300)
+            if random.random() < 0.4 and len(expected) > 0:
+                item = random.choice(expected)
+                expected.remove(item)
+                del tree[item]
+            else:
+                expected.append(item)
+                tree.insert(item)
+        self.assertEqual(sorted(expected), list(tree))
+        self.assertEqual(len(expected), len(tree))
+        self._assert_balanced(tree)
+        for item in list(expected):
+            del tree[item]
+        self.assertEqual(0, len(tree))
+        self.assertIsNone(tree.root)
+        self.assertEqual([], list(tree))
+
+
+class TestSortedListTree (unittest.TestCase):
+    def test_insert_search_and_delete(self):
+        tree = SortedListTree(load=2)
+        sample_data = [12, 1, 1, 23, 36, 36, 17, 6, 8, 44, 9]
+        for item in sample_data:
+            tree.insert(item)
+        self.assertTrue(len(tree.lists) > 1)
+        self.assertEqual(sorted(sample_data), list(tree))
+        self.assertTrue(17 in tree)
+        self.assertFalse(18 in tree)
+        self.assertFalse(100 in tree)
+        del tree[36]
+        self.assertTrue(36 in tree)
+        del tree[100]
+        self.assertEqual(10, len(tree))
+        for item in [1, 1, 23, 36, 17, 6, 8, 44, 9, 12]:
+            del tree[item]
+        self.assertEqual(0, len(tree))
+        self.assertEqual([], list(tree))
+        self.assertEqual([], tree.lists)
+
+    def test_smoke(self):
+        tree = SortedListTree(load=8)
+        expected = []
+        for _ in range(3000):
+            item = random.randint(1, 500)
+            if random.random() < 0.4 and len(expected) > 0:
+                item = random.choice(expected)
+                expected.remove(item)
+                del tree[item]
+            else:
+                expected.append(item)
+                tree.insert(item)
+        self.assertEqual(sorted(expected), list(tree))
+        self.assertEqual([sublist[-1] for sublist in tree.lists], tree.maxes)
+        self.assertTrue(all(map(lambda sublist: 0 < len(sublist) <= 16, tree.lists)))
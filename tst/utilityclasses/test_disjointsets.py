@@ -26,4 +26,38 @@ class TestDisjointSets (unittest.TestCase):
         self.assertEqual('c', test_ds.find_set('b'))
         self.assertEqual('c', test_ds.find_set('c'))
         self.assertEqual('c', test_ds.find_set('d'))
-        self.assertEqual(3, len(test_ds))
\ No newline at end of file
+        self.assertEqual(3, len(test_ds))
+
+    def test_union_by_size(self):
+        test_ds = DisjointSets(["a", "b", "c"])
+        self.assertTrue(test_ds.union("a", "b"))
+        self.assertFalse(test_ds.union("b", "a"))
+        test_ds.union("c", "a")
+        self.assertEqual("a", test_ds.find_set("c"))
+        self.assertEqual(1, len(test_ds))
+
+    def test_union_many_and_members(self):
+        test_ds = DisjointSets(range(10))
+        self.assertEqual(6, test_ds.union_many([(0, 1), (1, 2), (2, 0), (3, 4), (5, 6), (6, 7), (7, 8), (8, 5)]))
+        self.assertEqual(4, len(test_ds))
+        self.assertEqual({0, 1, 2}, test_ds.members(2))
+        self.assertEqual({9}, test_ds.members(9))
+        self.assertEqual([{0, 1, 2}, {3, 4}, {5, 6, 7, 8}, {9}], sorted(test_ds.groups().values(), key=min))
+        test_ds.union(9, 4)
+        self.assertEqual({3, 4, 9}, test_ds.members(9))
+
+    def test_results_are_copies(self):
+        test_ds = DisjointSets(range(4))
+        test_ds.union(0, 1)
+        test_ds.members(0).add(2)
+        test_ds.groups()[test_ds.find_set(0)].add(3)
+        del test_ds.groups()[test_ds.find_set(2)]
+        self.assertEqual({0, 1}, test_ds.members(1))
+        self.assertEqual([{0, 1}, {2}, {3}], sorted(test_ds.groups().values(), key=min))
+
+    def test_long_chains(self):
+        n = 100000
+        test_ds = DisjointSets(range(n))
+        test_ds.union_many([(i, i + 1) for i in range(n - 1)])
+        self.assertEqual(1, len(test_ds))
+        self.assertEqual(test_ds.find_set(0), test_ds.find_set(n - 1))
@@ -1,6 +1,11 @@
+import io
+import os
+import tempfile
 import unittest
 
-from thesoup.utilityclasses.graph import AdjListDiGraph, Edge, AdjListUndirectedDiGraph
+from array import array
+
+from thesoup.utilityclasses.graph import AdjListDiGraph, CSRGraph, Edge, AdjListUndirectedDiGraph
 
 
 class TestEdge (unittest.TestCase):
@@ -104,6 +109,59 @@ class TestDiGraph (unittest.TestCase):
         expected_edge_set = {Edge("A", "B", None), Edge("A", "C", None), Edge("C", "B", None)}
         self.assertEqual(expected_edge_set, g.edges())
 
+    def test_add_edges(self):
+        g = AdjListDiGraph()
+        for v in ["A", "B", "C"]:
+            g.add_vertex(v)
+        g.add_edges([Edge("A", "B", 1), Edge("B", "C", 2)])
+        self.assertEqual({Edge("A", "B", 1), Edge("B", "C", 2)}, g.edges())
+        with self.assertRaises(ValueError):
+            g.add_edges([Edge("A", "C", 3), Edge("A", "Z", 4)])
+        self.assertEqual({("B", 1)}, g.get_neighbours("A"))
+
+
+class TestStreamingLoaders (unittest.TestCase):
+    def setUp(self) -> None:
+        self.expected_edge_set = {Edge("A", "B", 155), Edge("A", "C", 12.5), Edge("C", "B", "x"), Edge("C", "D", None)}
+
+    def test_from_edge_list_file(self):
+        fp = io.StringIO("# comment\nA B 155\nA C 12.5\n\nC B x\nC D\n")
+        progress = []
+        g = AdjListDiGraph.from_edge_list_file(fp, batch_size=3, progress_callback=lambda n, t: progress.append(n))
+        self.assertEqual({"A", "B", "C", "D"}, g.vertices())
+        self.assertEqual(self.expected_edge_set, g.edges())
+        self.assertEqual([3, 4], progress)
+        with self.assertRaises(ValueError):
+            AdjListDiGraph.from_edge_list_file(io.StringIO("A B C D\n"))
+
+    def test_from_jsonl(self):
+        fp = io.StringIO('{"A": [["B", 155], ["C", 12.5]], "E": []}\n\n{"C": [["B", "x"], "D"]}\n')
+        g = AdjListDiGraph.from_jsonl(fp, batch_size=2)
+        self.assertEqual({"A", "B", "C", "D", "E"}, g.vertices())
+        self.assertEqual(self.expected_edge_set, g.edges())
+
+    def test_from_json_stream(self):
+        json_str = """
+        {
+            "A": [["B", 155], ["C", 12.5]],
+            "B": [],
+            "C": [["B", "x"], "D"],
+            "E" : [ ]
+        }
+        """
+        for chunk_size in [1, 3, 7, 1000]:
+            g = AdjListDiGraph.from_json_stream(io.StringIO(json_str), chunk_size=chunk_size, batch_size=2)
+            self.assertEqual({"A", "B", "C", "D", "E"}, g.vertices())
+            self.assertEqual(self.expected_edge_set, g.edges())
+        self.assertEqual(set(), AdjListDiGraph.from_json_stream(io.StringIO("{}")).vertices())
+        with self.assertRaises(ValueError):
+            AdjListDiGraph.from_json_stream(io.StringIO('{"A": [["B", 1]'))
+
+    def test_undirected_loader(self):
+        g = AdjListUndirectedDiGraph.from_edge_list_file(io.StringIO("A B 1\nB C 2\n"))
+        self.assertEqual(AdjListUndirectedDiGraph, type(g))
+        self.assertEqual({("A", 1), ("C", 2)}, g.get_neighbours("B"))
+
 
 class TestUndirectedGraph (unittest.TestCase):
     def test_undirected_graph(self):
@@ -119,3 +177,118 @@ class TestUndirectedGraph (unittest.TestCase):
         g.add_edge(Edge("A", "C", 117))
         g.add_edge(Edge("C", "F", 165))
         self.assertEqual(3, len(g.edges()))
+
+
+class TestCSRGraph (unittest.TestCase):
+    def test_freeze(self):
+        json_str = """
+        {
+            "A": [["B", 155], ["C", 123]],
+            "B": [],
+            "C": [["B", 98]]
+        }
+        """
+        g = AdjListDiGraph.from_json(json_str)
+        frozen = g.freeze()
+        self.assertEqual(3, frozen.num_vertices())
+        self.assertEqual(3, frozen.num_edges())
+        self.assertEqual({("B", 155), ("C", 123)}, set(frozen.get_neighbours("A")))
+        self.assertEqual({("B", 98)}, set(frozen.get_neighbours("C")))
+        self.assertEqual([], frozen.get_neighbours("B"))
+        self.assertIsNone(frozen.get_neighbours("Z"))
+        self.assertEqual(g.vertices(), frozen.vertices())
+        self.assertEqual(g.edges(), frozen.edges())
+        self.assertTrue("A" in frozen)
+        self.assertFalse("Z" in frozen)
+        self.assertTrue(Edge("A", "B", 155) in frozen)
+        self.assertFalse(Edge("A", "B", 154) in frozen)
+        self.assertEqual("array", type(frozen.weights).__name__)
+
+    def test_integer_vertices(self):
+        g = AdjListDiGraph()
+        for v in range(4):
+            g.add_vertex(v)
+        g.add_edge(Edge(0, 1, 0.5))
+        g.add_edge(Edge(0, 3, 2.0))
+        g.add_edge(Edge(2, 0, 1.5))
+        frozen = g.freeze()
+        self.assertIsNone(frozen.labels)
+        self.assertEqual("d", frozen.weights.typecode)
+        self.assertEqual({1, 3}, set(frozen.get_neighbour_ids(0)))
+        self.assertEqual({(1, 0.5), (3, 2.0)}, set(frozen.get_neighbours(0)))
+        self.assertFalse(4 in frozen)
+        self.assertEqual(g.edges(), frozen.edges())
+
+    def test_from_arrays(self):
+        frozen = CSRGraph(array("q", [0, 2, 3, 3]), array("q", [1, 2, 2]))
+        self.assertEqual({0, 1, 2}, frozen.vertices())
+        self.assertEqual({(1, None), (2, None)}, set(frozen.get_neighbours(0)))
+        with self.assertRaises(ValueError):
+            CSRGraph(array("q", [0, 2]), array("q", [1]))
+
+    def test_freeze_undirected(self):
+        g = AdjListUndirectedDiGraph()
+        for v in ["A", "C", "F"]:
+            g.add_vertex(v)
+        g.add_edge(Edge("A", "F", 100))
+        g.add_edge(Edge("A", "C", 117))
+        g.add_edge(Edge("C", "F", 165))
+        frozen = g.freeze()
+        self.assertFalse(frozen.directed)
+        self.assertEqual(6, frozen.num_edges())
+        self.assertEqual(g.edges(), frozen.edges())
+
+
+class TestGraphFile (unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "graph.bin")
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_round_trip(self):
+        json_str = """
+        {
+            "A": [["B", 155], ["C", 123]],
+            "B": [],
+            "C": [["B", 98], ["\u00e9", 1]],
+            "\u00e9": [["A", 7]]
+        }
+        """
+        g = AdjListDiGraph.from_json(json_str)
+        g.freeze().to_file(self.path)
+        loaded = CSRGraph.from_file(self.path)
+        self.assertEqual(g.vertices(), loaded.vertices())
+        self.assertEqual(g.edges(), loaded.edges())
+        self.assertEqual({("B", 98), ("\u00e9", 1)}, set(loaded.get_neighbours("C")))
+        self.assertTrue("\u00e9" in loaded)
+        self.assertFalse("Z" in loaded)
+        self.assertFalse(1 in loaded)
+        self.assertTrue(loaded.directed)
+
+    def test_integer_vertices_and_float_weights(self):
+        frozen = CSRGraph(array("q", [0, 2, 3, 3]), array("q", [1, 2, 2]), array("d", [0.5, 1.5, 2.5]), directed=False)
+        frozen.to_file(self.path)
+        loaded = CSRGraph.from_file(self.path)
+        self.assertIsNone(loaded.labels)
+        self.assertFalse(loaded.directed)
+        self.assertEqual({(1, 0.5), (2, 1.5)}, set(loaded.get_neighbours(0)))
+        self.assertEqual(frozen.edges(), loaded.edges())
+
+    def test_unsorted_labels(self):
+        frozen = CSRGraph(array("q", [0, 1, 1]), array("q", [1]), labels=[20, 10])
+        frozen.to_file(self.path)
+        loaded = CSRGraph.from_file(self.path)
+        self.assertEqual([(10, None)], loaded.get_neighbours(20))
+        self.assertEqual([], loaded.get_neighbours(10))
+        self.assertIsNone(loaded.get_neighbours(15))
+
+    def test_unsupported_graphs(self):
+        g = AdjListDiGraph.from_json('{"A": [["B", "x"]], "B": []}')
+        with self.assertRaises(ValueError):
+            g.freeze().to_file(self.path)
+        with open(self.path, "wb") as f:
+            f.write(b"\0" * 64)
+        with self.assertRaises(ValueError):
+            CSRGraph.from_file(self.path)
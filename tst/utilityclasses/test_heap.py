@@ -1,7 +1,8 @@
 import unittest
 import random
 
-from thesoup.utilityclasses.heap import MaxHeap, MinHeap
+from thesoup.utilityclasses.heap import IndexedMaxHeap, IndexedMinHeap, KeyedMaxHeap, KeyedMinHeap, MaxHeap, \
+    MinHeap
 
 
 class IntegerHeapElem:
@@ -36,6 +37,10 @@ class TestMinHeap (unittest.TestCase):
             results.append(test_heap.extract_extreme().__key__())
         self.assertEqual(sorted(sample_data), results)
 
+    def test_from_iterable_checks_keys(self):
+        with self.assertRaises(TypeError):
+            MinHeap.from_iterable([IntegerHeapElem(1), 2])
+
     def test_smoke(self):
         test_heap = MinHeap()
         sample_elements = [random.randint(1, 1000) for _ in range(50)]
@@ -78,3 +83,109 @@ class TestMaxHeap (unittest.TestCase):
         while len(test_heap) > 0:
             results.append(test_heap.extract_extreme().__key__())
         self.assertEqual(sorted(sample_elements, reverse=True), results)
+
+
+class TestIndexedMinHeap (unittest.TestCase):
+    def test_extract_min(self):
+        test_heap = IndexedMinHeap()
+        sample_elements = [1, 4, 2, 10, 7, 6, 19, 2, 4]
+        for idx, key in enumerate(sample_elements):
+            test_heap.insert("v{}".format(idx), key)
+        self.assertEqual(len(sample_elements), len(test_heap))
+        self.assertEqual(("v0", 1), test_heap.get_extreme())
+        results = []
+        while len(test_heap) > 0:
+            results.append(test_heap.extract_extreme()[1])
+        self.assertEqual(sorted(sample_elements), results)
+        self.assertIsNone(test_heap.extract_extreme())
+
+    def test_decrease_key_update_and_remove(self):
+        test_heap = IndexedMinHeap()
+        for item, key in [("a", 5), ("b", 3), ("c", 8), ("d", 1)]:
+            test_heap.insert(item, key)
+        test_heap.decrease_key("c", 0)
+        self.assertEqual(("c", 0), test_heap.get_extreme())
+        self.assertEqual(0, test_heap["c"])
+        with self.assertRaises(ValueError):
+            test_heap.decrease_key("a", 6)
+        test_heap.update("c", 10)
+        self.assertEqual(("d", 1), test_heap.get_extreme())
+        self.assertEqual(3, test_heap.remove("b"))
+        self.assertFalse("b" in test_heap)
+        with self.assertRaises(ValueError):
+            test_heap.insert("a", 2)
+        self.assertEqual(["d", "a", "c"], [test_heap.extract_extreme()[0] for _ in range(3)])
+
+    def test_smoke(self):
+        test_heap = IndexedMinHeap()
+        keys = dict([(i, random.randint(1, 1000)) for i in range(100)])
+        for item, key in keys.items():
+            test_heap.insert(item, key)
+        for item in random.sample(list(keys.keys()), 30):
+            keys[item] = random.randint(1, 1000)
+            test_heap.update(item, keys[item])
+        for item in random.sample(list(keys.keys()), 20):
+            test_heap.remove(item)
+            del keys[item]
+        results = []
+        while len(test_heap) > 0:
+            results.append(test_heap.extract_extreme()[1])
+        self.assertEqual(sorted(keys.values()), results)
+
+
+class TestIndexedMaxHeap (unittest.TestCase):
+    def test_increase_key(self):
+        test_heap = IndexedMaxHeap()
+        for item, key in [("a", 5), ("b", 3), ("c", 8), ("d", 1)]:
+            test_heap.insert(item, key)
+        self.assertEqual(("c", 8), test_heap.get_extreme())
+        test_heap.increase_key("d", 9)
+        self.assertEqual(("d", 9), test_heap.get_extreme())
+        with self.assertRaises(ValueError):
+            test_heap.increase_key("a", 4)
+        self.assertEqual(["d", "c", "a", "b"], [test_heap.extract_extreme()[0] for _ in range(4)])
+
+
+class TestKeyedMinHeap (unittest.TestCase):
+    def test_extract_min(self):
+        sample_elements = [1, 4, 2, 10, 7, 6, 19, 2, 4]
+        test_heap = KeyedMinHeap.from_iterable(list(map(lambda x: IntegerHeapElem(x), sample_elements)))
+        self.assertEqual(1, test_heap.get_extreme().__key__())
+        results = []
+        while len(test_heap) > 0:
+            results.append(test_heap.extract_extreme().__key__())
+        self.assertEqual(sorted(sample_elements), results)
+        self.assertIsNone(test_heap.extract_extreme())
+
+    def test_key_function_and_batches(self):
+        test_heap = KeyedMinHeap(key=len)
+        test_heap.push_many(["ccc", "a", "bb"])
+        test_heap.insert("dddd")
+        test_heap.push_many(["ee", "f"])
+        self.assertEqual(["a", "f", "bb"], test_heap.top(3))
+        self.assertEqual(6, len(test_heap))
+        self.assertEqual(["a", "f", "bb", "ee"], test_heap.pop_many(4))
+        self.assertEqual(["ccc", "dddd"], test_heap.pop_many(10))
+
+    def test_build_heap(self):
+        elements = [IntegerHeapElem(e) for e in [5, 3, 8]]
+        test_heap = KeyedMinHeap.from_iterable(elements)
+        elements[2].val = 1
+        test_heap.build_heap()
+        self.assertEqual(1, test_heap.get_extreme().__key__())
+
+    def test_smoke(self):
+        sample_elements = [random.randint(1, 1000) for _ in range(200)]
+        test_heap = KeyedMinHeap(key=lambda x: x)
+        for e in sample_elements:
+            test_heap.insert(e)
+        self.assertEqual(sorted(sample_elements), test_heap.pop_many(200))
+
+
+class TestKeyedMaxHeap (unittest.TestCase):
+    def test_extract_max(self):
+        sample_elements = ["pear", "apple", "fig", "plum", "kiwi"]
+        test_heap = KeyedMaxHeap.from_iterable(sample_elements, key=lambda x: x)
+        self.assertEqual("plum", test_heap.get_extreme())
+        self.assertEqual(["plum", "pear"], test_heap.top(2))
+        self.assertEqual(sorted(sample_elements, reverse=True), test_heap.pop_many(5))
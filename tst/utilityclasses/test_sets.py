@@ -1,4 +1,5 @@
 import unittest
+from array import array
 
 from thesoup.utilityclasses.sets import CountSet
 
@@ -63,3 +64,84 @@ class TestSets (unittest.TestCase):
         expected_pairs = {(1, 2), (2, 3), (3, 2), (4, 1), (5, 1)}
         for w, c in self.c1:
             self.assertTrue((w, c) in expected_pairs)
+
+    def test_count_sets_update_buffers(self):
+        counts = CountSet(array("q", self.arr1))
+        self.assertEqual(self.c1, counts)
+        self.assertEqual(len(self.arr1), len(counts))
+
+        counts.update(bytes(self.arr2))
+        self.assertEqual(CountSet(self.arr1 + self.arr2), counts)
+        self.assertEqual(len(self.arr1) + len(self.arr2), len(counts))
+
+        keys = CountSet({"a": 5, "b": "x"})
+        self.assertEqual({"a": 1, "b": 1}, keys.store)
+        self.assertEqual(2, len(keys))
+        keys.update({"a": 3})
+        self.assertEqual(2, keys["a"])
+
+        chars = CountSet("banana")
+        self.assertEqual(3, chars["a"])
+        self.assertEqual(6, len(chars))
+
+
+class TestCountSetAlgebra (unittest.TestCase):
+    def setUp(self) -> None:
+        self.c1 = CountSet("aaabbc")
+        self.c2 = CountSet("abbbd")
+
+    def check(self, expected: dict, actual: CountSet):
+        self.assertEqual(expected, actual.store)
+        self.assertEqual(sum(expected.values()), len(actual))
+
+    def test_in_place_add(self):
+        c1 = self.c1
+        c1 += self.c2
+        self.assertIs(self.c1, c1)
+        self.check({"a": 4, "b": 5, "c": 1, "d": 1}, c1)
+        c1 += c1
+        self.check({"a": 8, "b": 10, "c": 2, "d": 2}, c1)
+        with self.assertRaises(TypeError):
+            c1 += "abc"
+
+    def test_subtract(self):
+        self.check({"a": 2, "c": 1}, self.c1 - self.c2)
+        self.check({"b": 1, "d": 1}, self.c2 - self.c1)
+        self.check({"a": 3, "b": 2, "c": 1}, self.c1)
+
+        c1 = self.c1
+        c1 -= self.c2
+        self.assertIs(self.c1, c1)
+        self.check({"a": 2, "c": 1}, c1)
+        c1 -= c1
+        self.check({}, c1)
+        self.assertRaises(TypeError, lambda: self.c2 - [1])
+
+    def test_intersection_and_union(self):
+        self.check({"a": 1, "b": 2}, self.c1 & self.c2)
+        self.check({"a": 1, "b": 2}, self.c2 & self.c1)
+        self.check({"a": 3, "b": 3, "c": 1, "d": 1}, self.c1 | self.c2)
+        self.check({}, self.c1 & CountSet())
+        self.check({"a": 3, "b": 2, "c": 1}, self.c1 | CountSet())
+
+    def test_subsets(self):
+        self.assertTrue(CountSet("aab") <= self.c1)
+        self.assertTrue(self.c1 >= CountSet("aab"))
+        self.assertTrue(self.c1.issubset(self.c1))
+        self.assertTrue(CountSet().issubset(self.c1))
+        self.assertFalse(CountSet("bbb") <= self.c1)
+        self.assertFalse(CountSet("ad").issubset(self.c1))
+        self.assertFalse(self.c1.issuperset(self.c2))
+
+    def test_most_common(self):
+        counts = CountSet("abbcccddddeeeee")
+        self.assertEqual([("e", 5), ("d", 4)], counts.most_common(2))
+        self.assertEqual([("e", 5), ("d", 4), ("c", 3), ("b", 2), ("a", 1)], counts.most_common())
+        self.assertEqual([], counts.most_common(0))
+        self.assertEqual([("a", 2), ("b", 2)], CountSet("abab").most_common(2))
+
+    def test_elements(self):
+        elements = self.c1.elements()
+        self.assertEqual("a", next(elements))
+        self.assertEqual(["a", "a", "b", "b", "c"], list(elements))
+        self.assertEqual(self.c2, CountSet(self.c2.elements()))
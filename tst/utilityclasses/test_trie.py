@@ -1,6 +1,21 @@
+import gc
+import os
+import tempfile
 import unittest
 
-from thesoup.utilityclasses.trie import Trie
+from thesoup.utilityclasses.trie import AhoCorasick, FrozenTrie, RadixTrie, SparseTrie, SparseTrieNode, Trie, TrieNode
+
+
+class TestTrieNode (unittest.TestCase):
+    def test_leaf_node(self):
+        node = TrieNode()
+        self.assertFalse("a" in node)
+        self.assertIsNone(node["a"])
+        self.assertEqual([None] * TrieNode.ASCII_CHARSET_SIZE, list(node))
+        node.set_char("a", True)
+        self.assertTrue("a" in node)
+        self.assertTrue(node["a"].end_marker)
+        self.assertFalse("b" in node["a"])
 
 
 class TestTrie (unittest.TestCase):
@@ -27,3 +42,270 @@ class TestTrie (unittest.TestCase):
         self.assertEqual(["abcde", "abcd", "abde", "axyz"].sort(), test_trie["a"].sort())
         self.assertEqual(["axyz"].sort(), test_trie["ax"].sort())
         self.assertEqual(["axyz"].sort(), test_trie["axyz"].sort())
+
+    def test_index_missing_prefix(self):
+        test_trie = Trie()
+        test_trie.insert("abcd")
+        self.assertEqual([], test_trie["b"])
+        self.assertEqual([], test_trie["abcde"])
+
+
+class TestTrieBulkLoad (unittest.TestCase):
+    def test_insert_many(self):
+        words = ["to", "tea", "ted", "ten", "i", "in", "inn", "tea"]
+        trie = Trie()
+        trie.insert_many(words)
+        self.assertEqual(["i", "in", "inn", "tea", "ted", "ten", "to"], trie[""])
+        self.assertEqual(2, trie.score("tea"))
+        self.assertFalse("te" in trie)
+
+    def test_from_iterable(self):
+        words = sorted(["car", "card", "care", "cart", "cat", "do", "dog", "dot", "car"])
+        trie = Trie()
+        for word in words:
+            trie.insert(word)
+        bulk_trie = Trie.from_iterable(iter(words))
+        self.assertEqual(trie[""], bulk_trie[""])
+        for word in set(words):
+            self.assertEqual(trie.score(word), bulk_trie.score(word))
+        self.assertEqual(["car", "card", "care"], list(bulk_trie.iter_prefix("ca", limit=3, by_score=True)))
+
+        sparse_trie = SparseTrie.from_iterable(["東京", "東京都"])
+        self.assertTrue(isinstance(sparse_trie, SparseTrie))
+        self.assertEqual(["東京", "東京都"], sparse_trie["東"])
+
+    def test_pause_gc(self):
+        self.assertTrue(gc.isenabled())
+        words = ["car", "card", "cat"]
+        self.assertEqual(words, Trie.from_iterable(words, pause_gc=True)[""])
+        self.assertTrue(gc.isenabled())
+
+        gc.disable()
+        try:
+            Trie.from_iterable(words, pause_gc=True)
+            self.assertFalse(gc.isenabled())
+        finally:
+            gc.enable()
+
+    def test_long_word(self):
+        word = "a" * 10000
+        trie = Trie.from_iterable([word, word[:5000]])
+        trie.insert(word + "b")
+        self.assertTrue(word in trie)
+        self.assertFalse(word[:-1] in trie)
+        self.assertEqual([word[:5000], word, word + "b"], trie[word[:5000]])
+
+
+class TestTrieCompletion (unittest.TestCase):
+    def setUp(self):
+        self.trie = Trie()
+        for word, score in [("car", 5), ("card", 2), ("care", 9), ("cart", 1), ("cat", 9), ("do", 3), ("dog", 7)]:
+            self.trie.insert(word, score)
+
+    def test_lexicographic_order(self):
+        self.assertEqual(["car", "card", "care", "cart", "cat"], list(self.trie.iter_prefix("c")))
+        self.assertEqual(["car", "card", "care", "cart", "cat", "do", "dog"], list(self.trie.iter_prefix("")))
+
+    def test_limit(self):
+        self.assertEqual(["car", "card"], list(self.trie.iter_prefix("ca", limit=2)))
+        self.assertEqual([], list(self.trie.iter_prefix("ca", limit=0)))
+        self.assertEqual([], list(self.trie.iter_prefix("x", limit=2)))
+
+    def test_by_score(self):
+        self.assertEqual(["care", "cat", "car", "card", "cart"], list(self.trie.iter_prefix("c", by_score=True)))
+        self.assertEqual(["care", "cat", "dog"], list(self.trie.iter_prefix("", limit=3, by_score=True)))
+        self.assertEqual(["dog"], list(self.trie.iter_prefix("do", limit=1, by_score=True)))
+
+    def test_frequency_scores(self):
+        trie = Trie()
+        for word in ["to", "tea", "ted", "tea", "ten", "tea", "ted"]:
+            trie.insert(word)
+        self.assertEqual(3, trie.score("tea"))
+        self.assertEqual(2, trie.score("ted"))
+        self.assertIsNone(trie.score("te"))
+        self.assertEqual(["tea", "ted"], list(trie.iter_prefix("t", limit=2, by_score=True)))
+
+    def test_lazy(self):
+        completions = self.trie.iter_prefix("c")
+        self.assertEqual("car", next(completions))
+        self.assertEqual("card", next(completions))
+
+
+class TestSparseTrieNode (unittest.TestCase):
+    def test_leaf_node(self):
+        node = SparseTrieNode()
+        self.assertFalse("a" in node)
+        self.assertIsNone(node["a"])
+        self.assertEqual([], list(node))
+        node.set_char("é", True)
+        node.set_char("a")
+        self.assertTrue("é" in node)
+        self.assertTrue(node["é"].end_marker)
+        self.assertFalse(node["a"].end_marker)
+        self.assertEqual(["a", "é"], [char for char, _ in node.items()])
+        self.assertRaises(ValueError, node.set_char, "ab")
+
+
+class TestSparseTrie (unittest.TestCase):
+    def test_insert_and_search(self):
+        test_trie = SparseTrie()
+        for word in ["abcd", "abcde", "axyz", "café", "cafés", "東京", "東京都"]:
+            test_trie.insert(word)
+
+        for word in ["abcd", "abcde", "axyz", "café", "cafés", "東京", "東京都"]:
+            self.assertTrue(word in test_trie)
+        self.assertFalse("abc" in test_trie)
+        self.assertFalse("cafe" in test_trie)
+        self.assertFalse("東" in test_trie)
+
+    def test_index(self):
+        test_trie = SparseTrie()
+        for word in ["abcd", "abcde", "axyz", "café", "cafés", "東京", "東京都"]:
+            test_trie.insert(word)
+
+        self.assertEqual(["abcd", "abcde"], sorted(test_trie["ab"]))
+        self.assertEqual(["abcd", "abcde", "axyz"], sorted(test_trie["a"]))
+        self.assertEqual(["café", "cafés"], sorted(test_trie["caf"]))
+        self.assertEqual(["東京", "東京都"], sorted(test_trie["東"]))
+
+    def test_same_results_as_trie(self):
+        words = ["car", "card", "care", "cart", "cat", "do", "dog", "dot"]
+        trie = Trie()
+        sparse_trie = SparseTrie()
+        for word in words:
+            trie.insert(word)
+            sparse_trie.insert(word)
+        for prefix in ["c", "ca", "car", "d", "do", "dog"]:
+            self.assertEqual(sorted(trie[prefix]), sorted(sparse_trie[prefix]))
+
+    def test_by_score(self):
+        sparse_trie = SparseTrie()
+        for word, score in [("café", 1), ("cafés", 4), ("東京", 2)]:
+            sparse_trie.insert(word, score)
+        self.assertEqual(["cafés", "東京", "café"], list(sparse_trie.iter_prefix("", by_score=True)))
+
+
+WORDS = ["car", "card", "care", "cart", "cat", "do", "dog", "dot", "nation", "station", "café", "cafés", "東京", "東京都"]
+
+
+class TestRadixTrie (unittest.TestCase):
+    def setUp(self):
+        self.trie = RadixTrie()
+        for word in WORDS:
+            self.trie.insert(word)
+
+    def test_contains(self):
+        for word in WORDS:
+            self.assertTrue(word in self.trie)
+        for word in ["", "ca", "cards", "d", "東", "stat", "x"]:
+            self.assertFalse(word in self.trie)
+
+    def test_compression(self):
+        # "station" and "nation" hang off the root as whole words, and "car" and "cat" share the edge "ca"
+        self.assertEqual("station", self.trie.root.get_child("s").label)
+        self.assertEqual("ca", self.trie.root.get_child("c").label)
+
+    def test_split_edge(self):
+        trie = RadixTrie()
+        trie.insert("testing")
+        trie.insert("test")
+        trie.insert("team")
+        self.assertEqual("te", trie.root.get_child("t").label)
+        self.assertEqual(["team", "test", "testing"], trie[""])
+        self.assertFalse("tes" in trie)
+
+    def test_index(self):
+        self.assertEqual(sorted(WORDS), self.trie[""])
+        self.assertEqual(["car", "card", "care", "cart"], self.trie["car"])
+        self.assertEqual(["nation"], self.trie["na"])
+        self.assertEqual(["東京", "東京都"], self.trie["東"])
+        self.assertEqual([], self.trie["cax"])
+        self.assertEqual(["café", "cafés"], list(self.trie.iter_prefix("c", limit=2)))
+
+
+class TestFrozenTrie (unittest.TestCase):
+    def setUp(self):
+        self.trie = FrozenTrie.from_iterable(WORDS + ["car"])
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "words.trie")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def check(self, trie: FrozenTrie):
+        self.assertEqual(len(WORDS), len(trie))
+        for word in WORDS:
+            self.assertTrue(word in trie)
+        for word in ["", "ca", "cards", "東", "stat", "x"]:
+            self.assertFalse(word in trie)
+        self.assertEqual(sorted(WORDS), trie[""])
+        self.assertEqual(["car", "card", "care", "cart"], trie["car"])
+        self.assertEqual(["東京", "東京都"], trie["東"])
+        self.assertEqual([], trie["cax"])
+        self.assertEqual(["do", "dog"], list(trie.iter_prefix("d", limit=2)))
+
+    def test_lookups(self):
+        self.check(self.trie)
+
+    def test_shared_suffixes(self):
+        trie = FrozenTrie.from_iterable(["nation", "national", "station", "stational"])
+        # The root, the node at the end of "nation" and "station", and the one after "al"
+        self.assertEqual(3, trie.num_nodes())
+        self.assertEqual(["nation", "national", "station", "stational"], trie[""])
+
+    def test_freeze(self):
+        trie = Trie()
+        radix_trie = RadixTrie()
+        for word in ["car", "card", "cat", "do"]:
+            trie.insert(word)
+            radix_trie.insert(word)
+        self.assertEqual(["car", "card", "cat", "do"], trie.freeze()[""])
+        self.assertEqual(["car", "card", "cat", "do"], radix_trie.freeze()[""])
+        self.assertEqual([], FrozenTrie.from_iterable([])[""])
+
+    def test_file(self):
+        self.trie.to_file(self.path)
+        self.check(FrozenTrie.from_file(self.path))
+
+        with open(self.path, "wb") as f:
+            f.write(b"x" * 64)
+        self.assertRaises(ValueError, FrozenTrie.from_file, self.path)
+
+
+class TestAhoCorasick (unittest.TestCase):
+    def setUp(self):
+        self.automaton = AhoCorasick.from_iterable(["he", "she", "his", "hers", "café"])
+
+    def test_scan(self):
+        self.assertEqual(
+            [(1, "she"), (2, "he"), (2, "hers"), (11, "his")],
+            list(self.automaton.scan("ushers and his"))
+        )
+        self.assertEqual([(3, "café")], list(self.automaton.scan("le café")))
+        self.assertEqual([], list(self.automaton.scan("nothing to see")))
+        self.assertEqual([], list(self.automaton.scan("")))
+
+    def test_overlapping(self):
+        automaton = AhoCorasick.from_iterable(["a", "aa", "aaa"])
+        self.assertEqual(
+            [(0, "a"), (0, "aa"), (1, "a"), (0, "aaa"), (1, "aa"), (2, "a")],
+            list(automaton.scan("aaa"))
+        )
+
+    def test_from_trie(self):
+        trie = Trie()
+        for word in ["abc", "bcd", "c"]:
+            trie.insert(word)
+        automaton = AhoCorasick(trie)
+        trie.insert("d")
+        self.assertEqual([(0, "abc"), (2, "c"), (1, "bcd")], list(automaton.scan("abcd")))
+
+    def test_scan_stream(self):
+        text = "ushers and his café"
+        expected = list(self.automaton.scan(text))
+        self.assertEqual(expected, list(self.automaton.scan_stream(["us", "h", "ers and h", "is caf", "é"])))
+
+        encoded = text.encode("utf-8")
+        chunks = [encoded[i:i + 3] for i in range(0, len(encoded), 3)]
+        self.assertEqual(expected, list(self.automaton.scan_stream(chunks)))
+        self.assertEqual(expected, list(self.automaton.scan_stream([text.encode("utf-16")], encoding="utf-16")))
@@ -0,0 +1,65 @@
+import os
+import random
+import tempfile
+import unittest
+
+from thesoup.utilityfunctions.externalsort import external_sort
+
+
+def _second(pair):
+    return pair[1]
+
+
+class TestExternalSort (unittest.TestCase):
+    def setUp(self):
+        random.seed(7)
+        self.numbers = [random.randint(0, 1000) for _ in range(2000)]
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_in_memory(self):
+        self.assertEqual(sorted(self.numbers), list(external_sort(self.numbers, run_size=2000)))
+        self.assertEqual([], list(external_sort([])))
+
+    def test_spilled_runs(self):
+        tmp_dir = self.tmp_dir.name
+        self.assertEqual(sorted(self.numbers), list(external_sort(iter(self.numbers), run_size=100, tmp_dir=tmp_dir)))
+        self.assertEqual(sorted(self.numbers), list(external_sort(self.numbers, run_size=1999, tmp_dir=tmp_dir)))
+        # The temporary files are removed once the output is consumed
+        self.assertEqual([], os.listdir(tmp_dir))
+
+    def test_multiple_passes(self):
+        # 40 runs, merged 3 at a time
+        actual = external_sort(self.numbers, run_size=50, fan_in=3)
+        self.assertEqual(sorted(self.numbers), list(actual))
+
+    def test_key_reverse_and_stability(self):
+        pairs = [(i, number) for i, number in enumerate(self.numbers)]
+        self.assertEqual(
+            sorted(pairs, key=_second),
+            list(external_sort(pairs, key=_second, run_size=64, fan_in=4))
+        )
+        self.assertEqual(
+            sorted(pairs, key=_second, reverse=True),
+            list(external_sort(pairs, key=_second, reverse=True, run_size=64, fan_in=4))
+        )
+
+    def test_workers(self):
+        pairs = [(i, number) for i, number in enumerate(self.numbers)]
+        self.assertEqual(
+            sorted(pairs, key=_second),
+            list(external_sort(pairs, key=_second, run_size=100, fan_in=4, workers=2))
+        )
+
+    def test_early_close(self):
+        tmp_dir = self.tmp_dir.name
+        stream = external_sort(self.numbers, run_size=100, tmp_dir=tmp_dir)
+        self.assertEqual(min(self.numbers), next(stream))
+        stream.close()
+        self.assertEqual([], os.listdir(tmp_dir))
+
+    def test_invalid_arguments(self):
+        self.assertRaises(ValueError, external_sort, self.numbers, run_size=0)
+        self.assertRaises(ValueError, external_sort, self.numbers, fan_in=1)
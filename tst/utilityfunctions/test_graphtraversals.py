@@ -1,10 +1,12 @@
 import dataclasses
+import random
 import unittest
 
 from typing import Any, List, Tuple
 
-from thesoup.utilityclasses.graph import AdjListDiGraph, Graph
-from thesoup.utilityfunctions.graphtraversals import bfs, dfs, dijkstra, shortest_path_dag, trace
+from thesoup.utilityclasses.graph import AdjListDiGraph, AdjListUndirectedDiGraph, Edge, Graph
+from thesoup.utilityfunctions.graphtraversals import bfs, bfs_arrays, bfs_tree, dag_shortest_paths, dfs, \
+    dfs_postorder, dfs_preorder, dijkstra, dijkstra_lazy, path_to, shortest_path_dag, trace
 
 
 class TestGraphTraversals (unittest.TestCase):
@@ -61,6 +63,50 @@ class TestGraphTraversals (unittest.TestCase):
             set(), set(parents.keys())
         )
 
+    def test_bfs_tree(self):
+        json_str = """
+        {
+            "A": [["B", 155], ["C", 123]],
+            "B": [],
+            "C": [["B", 98], ["D", 109]],
+            "D": [["E", 98]],
+            "E": []
+        }
+        """
+        graph = AdjListDiGraph.from_json(json_str)
+        parents, levels = bfs_tree(graph, "A")
+        self.assertEqual({"A": None, "B": "A", "C": "A", "D": "C", "E": "D"}, parents)
+        self.assertEqual({"A": 0, "B": 1, "C": 1, "D": 2, "E": 3}, levels)
+        self.assertEqual((dict(), dict()), bfs_tree(graph, "Z"))
+
+        frozen = graph.freeze()
+        parents, levels = bfs_arrays(frozen, "C")
+        self.assertEqual([-1, 2, -1, 2, 3], list(parents))
+        self.assertEqual([-1, 1, 0, 1, 2], list(levels))
+
+    def test_direction_optimizing_bfs(self):
+        graph = AdjListDiGraph()
+        undirected = AdjListUndirectedDiGraph()
+        for v in range(300):
+            graph.add_vertex(v)
+            undirected.add_vertex(v)
+        for _ in range(3000):
+            edge = Edge(random.randrange(300), random.randrange(300), None)
+            graph.add_edge(edge)
+            undirected.add_edge(edge)
+        _, expected_levels = bfs_tree(graph, 0)
+        _, levels = bfs_tree(graph, 0, direction_optimizing=True)
+        self.assertEqual(expected_levels, levels)
+
+        for frozen in [graph.freeze(), undirected.freeze()]:
+            parents, array_levels = bfs_arrays(frozen, 0, direction_optimizing=True)
+            _, top_down_levels = bfs_arrays(frozen, 0)
+            self.assertEqual(list(top_down_levels), list(array_levels))
+            for v in range(300):
+                if array_levels[v] > 0:
+                    self.assertEqual(array_levels[parents[v]] + 1, array_levels[v])
+        self.assertEqual(expected_levels, dict([(v, l) for v, l in enumerate(bfs_arrays(graph.freeze(), 0)[1]) if l >= 0]))
+
     def test_dfs(self):
         json_str = """
         {
@@ -85,6 +131,39 @@ class TestGraphTraversals (unittest.TestCase):
         self.assertEqual({"E"}, set(dfs(graph, "E").keys()))
         self.assertEqual(set(), set(dfs(graph, "Z").keys()))
 
+    def test_dfs_orders(self):
+        json_str = """
+        {
+            "A": [["B", 155]],
+            "B": [["C", 1]],
+            "C": [["D", 109]],
+            "D": [["B", 98]],
+            "E": []
+        }
+        """
+        graph = AdjListDiGraph.from_json(json_str)
+        self.assertEqual(["A", "B", "C", "D"], list(dfs_preorder(graph, "A")))
+        self.assertEqual(["D", "C", "B", "A"], list(dfs_postorder(graph, "A")))
+        self.assertEqual([], list(dfs_preorder(graph, "Z")))
+        visited = {"C"}
+        self.assertEqual(["B"], list(dfs_postorder(graph, "B", visited)))
+        self.assertEqual({"B", "C"}, visited)
+
+    def test_deep_graphs(self):
+        depth = 50000
+        graph = AdjListDiGraph()
+        for v in range(depth):
+            graph.add_vertex(v)
+        for v in range(depth - 1):
+            graph.add_edge(Edge(v, v + 1, 1))
+        parents = dfs(graph, 0)
+        self.assertEqual(depth, len(parents))
+        self.assertEqual(depth - 2, parents[depth - 1])
+        self.assertEqual(list(range(depth - 1, -1, -1)), list(dfs_postorder(graph, 0)))
+        self.assertTrue(trace(graph, list(range(depth))))
+        preorder = dfs_preorder(graph, 0)
+        self.assertEqual([0, 1, 2], [next(preorder) for _ in range(3)])
+
     def test_dijkstra(self):
         sample_graph_json = """
         {
@@ -99,6 +178,49 @@ class TestGraphTraversals (unittest.TestCase):
         self.assertEqual({"A": 0, "B": 5, "C": 2, "D": 14}, d)
         self.assertEqual({"A": None, "B": "C", "C": "A", "D": "B"}, predecessors)
 
+    def test_dijkstra_lazy(self):
+        sample_graph_json = """
+        {
+            "A": [["B", 10], ["C", 2]],
+            "B": [["D", 9]],
+            "C": [["B", 3], ["D", 27]],
+            "D": [],
+            "E": []
+        }
+        """
+        graph = AdjListDiGraph.from_json(sample_graph_json)
+        d, predecessors = dijkstra_lazy(graph, "A")
+        self.assertEqual({"A": 0, "B": 5, "C": 2, "D": 14, "E": float("inf")}, d)
+        self.assertEqual({"A": None, "B": "C", "C": "A", "D": "B", "E": None}, predecessors)
+        self.assertEqual((dict(), dict()), dijkstra_lazy(graph, "Z"))
+
+    def test_dijkstra_variants_agree(self):
+        graph = AdjListDiGraph()
+        for v in range(200):
+            graph.add_vertex(v)
+        for _ in range(1000):
+            graph.add_edge(Edge(random.randrange(200), random.randrange(200), random.randint(1, 100)))
+        d1, _ = dijkstra(graph, 0)
+        d2, _ = dijkstra_lazy(graph, 0)
+        self.assertEqual(d1, d2)
+
+    def test_on_frozen_graph(self):
+        sample_graph_json = """
+        {
+            "A": [["B", 10], ["C", 2]],
+            "B": [["D", 9]],
+            "C": [["B", 3], ["D", 27]],
+            "D": []
+        }
+        """
+        graph = AdjListDiGraph.from_json(sample_graph_json).freeze()
+        self.assertEqual(({"A": 0, "B": 5, "C": 2, "D": 14}, {"A": None, "B": "C", "C": "A", "D": "B"}),
+                         dijkstra(graph, "A"))
+        self.assertEqual({"A", "B", "C", "D"}, set(dfs(graph, "A").keys()))
+        levels = dict()
+        bfs(graph, "A", lambda info: levels.update({info[1]: info[2]}))
+        self.assertEqual({"A": 0, "B": 1, "C": 1, "D": 2}, levels)
+
     def test_shortest_path_dag(self):
         sample_graph_json = """
         {
@@ -176,6 +298,42 @@ class TestGraphTraversals (unittest.TestCase):
             predecessors
         )
 
+    def test_dag_shortest_paths(self):
+        sample_graph_json = """
+            {
+                "A": [["B", 1], ["C", 12]],
+                "B": [["C", 3], ["D", 7]],
+                "C": [["D", 1]],
+                "D": [],
+                "E": [["A", -4]]
+            }
+            """
+        graph = AdjListDiGraph.from_json(sample_graph_json)
+        d, predecessors = dag_shortest_paths(graph, "A")
+        self.assertEqual({"A": 0, "B": 1, "C": 4, "D": 5, "E": float("inf")}, d)
+        self.assertEqual(["A", "B", "C", "D"], path_to(predecessors, "D"))
+        self.assertEqual(["E"], path_to(predecessors, "E"))
+        self.assertEqual([], path_to(predecessors, "Z"))
+
+        d, predecessors = dag_shortest_paths(graph, "A", longest=True)
+        self.assertEqual({"A": 0, "B": 1, "C": 12, "D": 13, "E": float("-inf")}, d)
+        self.assertEqual(["A", "C", "D"], path_to(predecessors, "D"))
+
+        d, _ = dag_shortest_paths(graph, "E")
+        self.assertEqual(-3, d["B"])
+        self.assertEqual((dict(), dict()), dag_shortest_paths(graph, "Z"))
+
+    def test_deep_dag_shortest_path(self):
+        depth = 50000
+        graph = AdjListDiGraph()
+        for v in range(depth):
+            graph.add_vertex(v)
+        for v in range(depth - 1):
+            graph.add_edge(Edge(v, v + 1, 1))
+        sp, predecessors = shortest_path_dag(graph, 0, depth - 1)
+        self.assertEqual(depth - 1, sp)
+        self.assertEqual(depth, len(predecessors))
+
     def test_trace(self):
         sample_graph_json = """
             {
@@ -1,6 +1,7 @@
+import random
 import unittest
 
-from thesoup.utilityfunctions.graphutils import topological_sort, kruskal
+from thesoup.utilityfunctions.graphutils import topological_sort, kruskal, kruskal_edges, prim
 from thesoup.utilityclasses.graph import AdjListDiGraph, AdjListUndirectedDiGraph, Edge
 
 
@@ -40,3 +41,85 @@ class TestGraphUtils (unittest.TestCase):
         """
         graph = AdjListUndirectedDiGraph.from_json(sample_graph_json)
         self.assertEqual({Edge("A", "D", 4), Edge("B", "D", 2), Edge("C", "D", 3)}, kruskal(graph))
+
+    def test_kruskal_only_keeps_tree_edges(self):
+        sample_graph_json = """
+        {
+            "A": [["B", 1], ["C", 2]],
+            "B": [["C", 1]],
+            "C": []
+        }
+        """
+        graph = AdjListUndirectedDiGraph.from_json(sample_graph_json)
+        self.assertEqual({Edge("A", "B", 1), Edge("B", "C", 1)}, kruskal(graph))
+
+    def test_kruskal_edges_streaming(self):
+        consumed = []
+
+        def _edges():
+            for edge in [Edge("A", "B", 1), Edge("B", "C", 2), Edge("A", "C", 3), Edge("C", "D", 4)]:
+                consumed.append(edge)
+                yield edge
+
+        self.assertEqual(
+            {Edge("A", "B", 1), Edge("B", "C", 2)},
+            kruskal_edges(["A", "B", "C"], _edges(), presorted=True)
+        )
+        self.assertEqual(2, len(consumed))
+        self.assertEqual(set(), kruskal_edges(["A"], [Edge("A", "A", 1)]))
+
+    def test_spanning_forest(self):
+        sample_graph_json = """
+        {
+            "A": [["B", 9], ["C", 8], ["D", 4]],
+            "B": [["D", 2]],
+            "C": [["D", 3]],
+            "D": [],
+            "E": [["F", 5], ["G", 1]],
+            "F": [["G", 2]],
+            "G": []
+        }
+        """
+        graph = AdjListUndirectedDiGraph.from_json(sample_graph_json)
+        expected = {Edge("A", "D", 4), Edge("B", "D", 2), Edge("C", "D", 3), Edge("E", "G", 1), Edge("F", "G", 2)}
+        self.assertEqual(expected, kruskal(graph))
+        self.assertEqual(expected, prim(graph))
+        self.assertEqual({Edge("E", "G", 1), Edge("F", "G", 2)}, prim(graph, "F"))
+        self.assertEqual(set(), prim(graph, "Z"))
+
+    def test_prim_agrees_with_kruskal(self):
+        graph = AdjListUndirectedDiGraph()
+        for v in range(100):
+            graph.add_vertex(v)
+        for _ in range(500):
+            graph.add_edge(Edge(random.randrange(100), random.randrange(100), random.randint(1, 1000)))
+        self.assertEqual(
+            sum(map(lambda e: e.ppt, kruskal(graph))),
+            sum(map(lambda e: e.ppt, prim(graph)))
+        )
+        self.assertEqual(len(kruskal(graph)), len(prim(graph)))
+
+    def test_on_frozen_graphs(self):
+        sample_graph_json = """
+        {
+            "A": [["B", 9], ["C", 8], ["D", 4]],
+            "B": [["D", 2]],
+            "C": [["D", 3]],
+            "D": []
+        }
+        """
+        frozen = AdjListDiGraph.from_json(sample_graph_json).freeze()
+        order = list(topological_sort(frozen))
+        self.assertEqual("A", order[0])
+        self.assertEqual("D", order[-1])
+        frozen_undirected = AdjListUndirectedDiGraph.from_json(sample_graph_json).freeze()
+        self.assertEqual({Edge("A", "D", 4), Edge("B", "D", 2), Edge("C", "D", 3)}, kruskal(frozen_undirected))
+
+    def test_topological_sort_deep_graph(self):
+        depth = 50000
+        graph = AdjListDiGraph()
+        for v in range(depth):
+            graph.add_vertex(v)
+        for v in range(depth - 1):
+            graph.add_edge(Edge(v, v + 1, 1))
+        self.assertEqual(list(range(depth)), list(topological_sort(graph)))
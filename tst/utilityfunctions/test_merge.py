@@ -1,6 +1,10 @@
+import io
+import itertools
+import random
+from array import array
 import unittest
 
-from thesoup.utilityfunctions.merge import merge
+from thesoup.utilityfunctions.merge import _split_points, kway_merge, merge, parallel_merge
 from thesoup.utilityfunctions.collectionutils import flatten
 
 
@@ -32,3 +36,91 @@ class TestMerge (unittest.TestCase):
         self.assertEqual(expected_list, actual_1)
         self.assertEqual(actual_1, actual_2)
         self.assertEqual(actual_2, actual_3)
+
+    def test_edge_cases(self):
+        self.assertEqual([], merge([], []))
+        self.assertEqual([1, 2], merge([], [1, 2], []))
+        self.assertEqual([], merge())
+
+
+class TestKWayMerge (unittest.TestCase):
+    def test_iterators(self):
+        actual = kway_merge(iter([1, 4, 7]), (i for i in [2, 5, 8]), [3, 6, 9], [])
+        self.assertEqual(list(range(1, 10)), list(actual))
+        self.assertEqual([], list(kway_merge()))
+
+    def test_lazy(self):
+        evens = itertools.count(0, 2)
+        odds = itertools.count(1, 2)
+        self.assertEqual(list(range(10)), list(itertools.islice(kway_merge(evens, odds), 10)))
+
+    def test_key_and_reverse(self):
+        l1 = ["a", "ccc", "eeeee"]
+        l2 = ["bb", "dddd"]
+        self.assertEqual(["a", "bb", "ccc", "dddd", "eeeee"], list(kway_merge(l1, l2, key=len)))
+        self.assertEqual([9, 8, 5, 3, 2, 1], list(kway_merge([9, 5, 1], [8, 3, 2], reverse=True)))
+        self.assertEqual(
+            ["eeeee", "dddd", "ccc", "bb", "a"],
+            list(kway_merge(l1[::-1], l2[::-1], key=len, reverse=True))
+        )
+
+    def test_stable(self):
+        l1 = [(1, "a"), (2, "a")]
+        l2 = [(1, "b"), (2, "b")]
+        l3 = [(1, "c")]
+        self.assertEqual(
+            [(1, "a"), (1, "b"), (1, "c"), (2, "a"), (2, "b")],
+            list(kway_merge(l1, l2, l3, key=lambda pair: pair[0]))
+        )
+
+    def test_files(self):
+        f1 = io.StringIO("apple\ncherry\n")
+        f2 = io.StringIO("banana\ndate\n")
+        self.assertEqual(["apple\n", "banana\n", "cherry\n", "date\n"], list(kway_merge(f1, f2)))
+
+
+class TestParallelMerge (unittest.TestCase):
+    def setUp(self):
+        random.seed(11)
+        self.lists = [sorted(random.randint(0, 500) for _ in range(size)) for size in [1000, 10, 0, 3000, 700]]
+        self.expected = sorted(flatten(self.lists))
+
+    def test_lists(self):
+        self.assertEqual(self.expected, parallel_merge(*self.lists, workers=2))
+        self.assertEqual(self.expected, parallel_merge(*self.lists, workers=2, partitions=9))
+        self.assertEqual(self.expected, parallel_merge(*self.lists, workers=1))
+
+    def test_arrays(self):
+        actual = parallel_merge(*[array("q", lst) for lst in self.lists], workers=2, partitions=5)
+        self.assertEqual(array("q", self.expected), actual)
+
+        actual = parallel_merge(*[array("d", lst) for lst in self.lists], workers=2)
+        self.assertEqual(array("d", self.expected), actual)
+
+        # Non numeric arrays are not put in shared memory
+        self.assertEqual(array("u", "abcdef"), parallel_merge(array("u", "ace"), array("u", "bdf"), workers=2))
+
+        # Mixed inputs are merged as lists
+        self.assertEqual(self.expected, parallel_merge(array("q", self.lists[0]), *self.lists[1:], workers=2))
+
+    def test_edge_cases(self):
+        self.assertEqual([], parallel_merge(workers=2))
+        self.assertEqual(array("q"), parallel_merge(array("q"), array("q"), workers=2))
+        self.assertEqual([5, 5, 5, 5], parallel_merge([5, 5], [5], [5], workers=2, partitions=3))
+
+    def test_balanced_split_points(self):
+        self.assertEqual(
+            [[0, 0], [500, 0], [1000, 0], [1000, 500], [1001, 1000]],
+            _split_points([[1] * 1000 + [2], [1] * 1000], 4)
+        )
+        self.assertEqual(
+            [[0, 0, 0], [2, 1, 0], [3, 3, 0], [3, 3, 3]],
+            _split_points([[1, 2, 5], [2, 3, 4], [6, 7, 8]], 3)
+        )
+        self.assertEqual([[0, 0], [0, 0], [0, 1]], _split_points([[], [1]], 2))
+
+    def test_stable(self):
+        # 1 and 1.0 compare equal, and come out in the order of the inputs
+        actual = parallel_merge([1, 1, 2], [1.0, 1.0, 2.0], workers=2, partitions=4)
+        self.assertEqual([1, 1, 1.0, 1.0, 2, 2.0], actual)
+        self.assertEqual([int, int, float, float, int, float], [type(elem) for elem in actual])
@@ -10,3 +10,6 @@ class TestStringUtils (unittest.TestCase):
         s3 = "potato"
         self.assertTrue(is_anagram(s1, s2))
         self.assertFalse(is_anagram(s2, s3))
+        self.assertFalse(is_anagram("cinema", "icemen"))
+        self.assertFalse(is_anagram("cinema", "cinemas"))
+        self.assertTrue(is_anagram("", ""))